@@ -0,0 +1,41 @@
+"""Create user_effective_permissions
+
+Revision ID: 014ed00709a7
+Revises: 4e922d48fc75
+Create Date: 2025-10-21 09:47:05.219364
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '014ed00709a7'
+down_revision: Union[str, Sequence[str], None] = '4e922d48fc75'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_effective_permissions',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('permission_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['permission_id'], ['permissions.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'permission_id')
+    )
+    # Backfill from the existing role assignments
+    op.execute("""
+        INSERT INTO user_effective_permissions (user_id, permission_id)
+        SELECT DISTINCT ur.user_id, rp.permission_id
+        FROM user_roles ur
+        JOIN role_permissions rp ON rp.role_id = ur.role_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_effective_permissions')
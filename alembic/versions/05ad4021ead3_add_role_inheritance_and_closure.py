@@ -0,0 +1,58 @@
+"""Add role_inheritance and role_closure
+
+Revision ID: 05ad4021ead3
+Revises: 014ed00709a7
+Create Date: 2025-10-22 14:03:52.871920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '05ad4021ead3'
+down_revision: Union[str, Sequence[str], None] = '014ed00709a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('role_inheritance',
+    sa.Column('role_id', sa.Integer(), nullable=False),
+    sa.Column('inherited_role_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['inherited_role_id'], ['roles.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['role_id'], ['roles.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('role_id', 'inherited_role_id')
+    )
+    op.create_index(op.f('ix_role_inheritance_inherited_role_id'), 'role_inheritance', ['inherited_role_id'], unique=False)
+    op.create_table('role_closure',
+    sa.Column('role_id', sa.Integer(), nullable=False),
+    sa.Column('implied_role_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['implied_role_id'], ['roles.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['role_id'], ['roles.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('role_id', 'implied_role_id')
+    )
+    op.create_index(op.f('ix_role_closure_implied_role_id'), 'role_closure', ['implied_role_id'], unique=False)
+    # No inheritance exists yet, so the closure is just every role implying itself
+    op.execute("INSERT INTO role_closure (role_id, implied_role_id) SELECT id, id FROM roles")
+
+    if op.get_bind().dialect.name == 'postgresql':
+        # Hierarchy changes alter effective role permissions; see 4e922d48fc75
+        op.execute("""
+            CREATE TRIGGER trg_role_closure_bump_roles_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON role_closure
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_roles_version()
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP TRIGGER IF EXISTS trg_role_closure_bump_roles_version ON role_closure")
+    op.drop_index(op.f('ix_role_closure_implied_role_id'), table_name='role_closure')
+    op.drop_table('role_closure')
+    op.drop_index(op.f('ix_role_inheritance_inherited_role_id'), table_name='role_inheritance')
+    op.drop_table('role_inheritance')
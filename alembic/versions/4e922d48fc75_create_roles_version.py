@@ -0,0 +1,57 @@
+"""Create roles_version counter with change triggers
+
+Revision ID: 4e922d48fc75
+Revises: 4d2d4b10e2b4
+Create Date: 2025-10-20 10:12:31.504118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e922d48fc75'
+down_revision: Union[str, Sequence[str], None] = '4d2d4b10e2b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+VERSIONED_TABLES = ('roles', 'permissions', 'role_permissions')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('roles_version',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO roles_version (id, version) VALUES (1, 0)")
+
+    # Also bump on raw SQL edits that bypass the ORM listener in src/db/events.py
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("""
+            CREATE FUNCTION bump_roles_version() RETURNS trigger AS $$
+            BEGIN
+                UPDATE roles_version SET version = version + 1 WHERE id = 1;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+        for table in VERSIONED_TABLES:
+            op.execute(f"""
+                CREATE TRIGGER trg_{table}_bump_roles_version
+                AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+                FOR EACH STATEMENT EXECUTE FUNCTION bump_roles_version()
+            """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        for table in VERSIONED_TABLES:
+            op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_bump_roles_version ON {table}")
+        op.execute("DROP FUNCTION IF EXISTS bump_roles_version()")
+    op.drop_table('roles_version')
@@ -0,0 +1,30 @@
+"""Add roles_version.next_bit permission bit allocator
+
+Revision ID: 7c3e1f0a9b52
+Revises: 2adabb7fa184
+Create Date: 2025-11-10 09:21:44.318027
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3e1f0a9b52'
+down_revision: Union[str, Sequence[str], None] = '2adabb7fa184'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('roles_version', sa.Column('next_bit', sa.Integer(), server_default='0', nullable=False))
+    # Bits already handed out stay taken; the ones of permissions deleted since are lost, as before
+    op.execute("UPDATE roles_version SET next_bit = (SELECT COALESCE(MAX(bit_index) + 1, 0) FROM permissions)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('roles_version', 'next_bit')
@@ -0,0 +1,37 @@
+"""Add permissions.bit_index for compact token claims
+
+Revision ID: cdf4367589df
+Revises: 05ad4021ead3
+Create Date: 2025-10-23 16:40:11.092736
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'cdf4367589df'
+down_revision: Union[str, Sequence[str], None] = '05ad4021ead3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('permissions', sa.Column('bit_index', sa.Integer(), nullable=True))
+    # Existing permissions get bits in id order
+    op.execute("""
+        UPDATE permissions SET bit_index = numbered.bit
+        FROM (SELECT id, ROW_NUMBER() OVER (ORDER BY id) - 1 AS bit FROM permissions) AS numbered
+        WHERE permissions.id = numbered.id
+    """)
+    op.alter_column('permissions', 'bit_index', nullable=False)
+    op.create_unique_constraint('uq_permissions_bit_index', 'permissions', ['bit_index'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_permissions_bit_index', 'permissions', type_='unique')
+    op.drop_column('permissions', 'bit_index')
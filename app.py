@@ -1,18 +1,94 @@
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify
+from werkzeug.middleware.proxy_fix import ProxyFix
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from src.core.config import config
+from src.core.hash_pool import hash_pool, HashPoolSaturated
+from src.core.metrics import metrics, render_gauges
+from src.core.rate_limit import RateLimited, rate_limit_stats
+from src.db import base as db_base
+from src.api.auth_middleware import init_auth, token_cache
+from src.api.instrumentation import init_metrics
 from src.api.routes_auth import bp_auth
+from src.api.routes_admin import bp_admin
+from src.services.permission_cache import role_permission_cache
+from src.services.revocation import revocation_list
+from src.services.token_versions import token_version_map
+from src.services.login_audit import login_audit
 
 def create_app():
     app = Flask(config.APP_NAME)
+    if config.TRUSTED_PROXY_HOPS:
+        # request.remote_addr becomes the client address seen by the outermost trusted proxy
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=config.TRUSTED_PROXY_HOPS, x_proto=config.TRUSTED_PROXY_HOPS)
+    init_metrics(app)  # first, so token verification falls inside the timed span
+    db_base.init_app(app)
+    init_auth(app)
     app.register_blueprint(bp_auth)
+    app.register_blueprint(bp_admin)
+
+    @app.errorhandler(HashPoolSaturated)
+    def hash_pool_saturated(exc: HashPoolSaturated):
+        resp = jsonify({"details": "Server busy, retry shortly"})
+        resp.headers["Retry-After"] = str(exc.retry_after)
+        return resp, 503
+
+    @app.errorhandler(RateLimited)
+    def rate_limited(exc: RateLimited):
+        resp = jsonify({"details": "Too many attempts, retry later"})
+        resp.headers["Retry-After"] = str(exc.retry_after)
+        return resp, 429
+
+    @app.errorhandler(PoolTimeoutError)
+    def db_pool_exhausted(exc: PoolTimeoutError):
+        resp = jsonify({"details": "Server busy, retry shortly"})
+        resp.headers["Retry-After"] = "1"
+        return resp, 503
 
     @app.get("/health")
     def health():
-        return jsonify({"status": "ok"}), 200
+        return jsonify({
+            "status": "ok",
+            "db_pool": db_base.pool_stats(),
+            "replicas": db_base.replica_set.stats(),
+            "hash_pool": hash_pool.stats(),
+            "role_cache": role_permission_cache.stats(),
+            "token_cache": token_cache.stats(),
+            "revocations": revocation_list.stats(),
+            "token_versions": token_version_map.stats(),
+            "login_audit": login_audit.stats(),
+            "rate_limit": rate_limit_stats(),
+        }), 200
+
+    @app.get("/metrics")
+    def prometheus_metrics():
+        lines = metrics.render()
+        for name, stats in (
+            ("db_pool", db_base.pool_stats()),
+            ("hash_pool", hash_pool.stats()),
+            ("role_cache", role_permission_cache.stats()),
+            ("token_cache", token_cache.stats()),
+            ("revocations", revocation_list.stats()),
+            ("token_versions", token_version_map.stats()),
+            ("login_audit", login_audit.stats()),
+            ("rate_limit", rate_limit_stats()),
+        ):
+            lines += render_gauges(name, stats)
+        return Response("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
     
     return app
 
-app = create_app()
+_app = None
+
+
+def __getattr__(name):
+    # `app:app` keeps working, but the app is only built when a server asks for it;
+    # pre-forking servers should prefer the factory: gunicorn 'app:create_app()'
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == "__main__":
-    app.run(debug=config.DEBUG)
\ No newline at end of file
+    create_app().run(debug=config.DEBUG)
@@ -0,0 +1,101 @@
+from typing import Optional
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from src.core.config import config
+from src.core.hash_pool import hash_pool, HashPoolSaturated
+from src.core.rate_limit import RateLimited
+from src.db.async_base import AsyncSessionLocal
+from src.db.models import ProviderEnum
+from src.services.auth_service import AuthService
+
+# ASGI entry point alongside app.py:  uvicorn asgi:create_app --factory
+# Serves the login path without tying up a worker thread per in-flight request.
+# Behind a load balancer set TRUSTED_PROXY_HOPS, so the login throttle sees client addresses.
+
+auth_service = AuthService()
+
+
+async def health(request: Request):
+    return JSONResponse({"status": "ok", "hash_pool": hash_pool.stats()})
+
+
+def _client_ip(request: Request) -> Optional[str]:
+    """The caller's address, read from X-Forwarded-For behind TRUSTED_PROXY_HOPS proxies (as ProxyFix does in app.py)."""
+    if config.TRUSTED_PROXY_HOPS:
+        forwarded = [part.strip() for part in request.headers.get("x-forwarded-for", "").split(",") if part.strip()]
+        if len(forwarded) >= config.TRUSTED_PROXY_HOPS:
+            return forwarded[-config.TRUSTED_PROXY_HOPS]
+    return request.client.host if request.client else None
+
+
+async def login(request: Request):
+    try:
+        data = await request.json() or {}
+    except ValueError:
+        data = {}
+    identifier = data.get("identifier")
+    password = data.get("password")
+    provider = data.get("provider")
+
+    # Coerce provider string to enum if given (ignore invalid), as routes_auth.login does
+    provider_enum = None
+    if provider:
+        try:
+            provider_enum = ProviderEnum(provider)
+        except ValueError:
+            provider_enum = None
+
+    async with AsyncSessionLocal() as db:
+        tokens = await auth_service.login_with_refresh_async(
+            db,
+            identifier=identifier,
+            password=password,
+            provider=provider_enum,
+            client_ip=_client_ip(request),
+        )
+
+    if not tokens: return JSONResponse({"details": "Invalid credentials"}, status_code=401)
+    access_token, refresh_token = tokens
+    return JSONResponse({"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"})
+
+
+async def hash_pool_saturated(request: Request, exc: HashPoolSaturated):
+    return JSONResponse(
+        {"details": "Server busy, retry shortly"},
+        status_code=503,
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+async def rate_limited(request: Request, exc: RateLimited):
+    return JSONResponse(
+        {"details": "Too many attempts, retry later"},
+        status_code=429,
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+async def db_pool_exhausted(request: Request, exc: PoolTimeoutError):
+    return JSONResponse(
+        {"details": "Server busy, retry shortly"},
+        status_code=503,
+        headers={"Retry-After": "1"},
+    )
+
+
+def create_app() -> Starlette:
+    return Starlette(
+        debug=config.DEBUG,
+        routes=[
+            Route("/health", health, methods=["GET"]),
+            Route("/auth/login", login, methods=["POST"]),
+        ],
+        exception_handlers={
+            HashPoolSaturated: hash_pool_saturated,
+            RateLimited: rate_limited,
+            PoolTimeoutError: db_pool_exhausted,
+        },
+    )
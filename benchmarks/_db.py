@@ -0,0 +1,20 @@
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from src.db.base import Base
+from src.db import models  # noqa: F401 ensure models are imported
+
+
+def make_sessionmaker(url: str = "sqlite://", drop: bool = True, **engine_kwargs):
+    """Fresh schema on a throwaway database (in-memory SQLite by default)."""
+    kwargs = {"poolclass": StaticPool, "connect_args": {"check_same_thread": False}} if url == "sqlite://" else {}
+    engine = create_engine(url, **kwargs, **engine_kwargs)
+    if engine.dialect.name == "sqlite":
+        @event.listens_for(engine, "connect")
+        def _enable_fks(dbapi_conn, _):
+            # Match Postgres ON DELETE CASCADE behaviour
+            dbapi_conn.execute("PRAGMA foreign_keys=ON")
+    if drop:
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+    return engine, sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
@@ -0,0 +1,253 @@
+"""Benchmark the login hot path end to end and by phase on a seeded throwaway database.
+
+Seeds N users x M roles x K permissions, then measures AuthService.login,
+its phases (identity lookup, Argon2 verify, role/permission aggregation,
+JWT encode) and POST /auth/login through the Flask test client.
+
+Usage:
+    python -m benchmarks.bench_login [--users 1000 --roles 20 --perms 200] [--logins 200] [--out results.json]
+"""
+import argparse, json, random, subprocess, time
+from datetime import datetime, timezone
+from sqlalchemy import event, insert
+from src.core.config import config
+from src.core.jwt_tools import issue_access_token
+from src.core.perm_bits import encode_permission_bits
+from src.core.security import hash_password, verify_and_update_password
+from src.db import base as db_base
+from src.db.models import AuthIdentity, Permission, ProviderEnum, Role, User, user_roles
+from src.services.auth_service import AuthService
+from src.services.effective_permissions import rebuild_all
+from src.services.permission_cache import role_permission_cache
+from src.services.permission_registry import permission_registry
+from src.services.role_hierarchy import rebuild_closure
+from benchmarks._db import make_sessionmaker
+
+PASSWORD = "bench-password"
+
+
+def _identifier(i: int) -> str:
+    return f"user{i}@bench.local"
+
+
+def seed(Session, users: int, roles: int, perms: int, perms_per_role: int, roles_per_user: int, rng: random.Random) -> None:
+    db = Session()
+    try:
+        permissions = [Permission(code=f"resource{i}:action") for i in range(perms)]
+        role_rows = [
+            Role(name=f"role{i}", permissions=rng.sample(permissions, min(perms_per_role, perms)))
+            for i in range(roles)
+        ]
+        db.add_all(role_rows)
+        db.commit()
+
+        # One hash shared by every identity: seeding N Argon2 hashes would dominate the run
+        password_hash = hash_password(PASSWORD, ProviderEnum.email)
+        db.execute(insert(User), [{"id": i + 1, "full_name": f"User {i}", "email": _identifier(i), "is_active": True} for i in range(users)])
+        db.execute(insert(AuthIdentity), [
+            {
+                "user_id": i + 1,
+                "provider": ProviderEnum.email,
+                "identifier": _identifier(i),
+                "identifier_normalized": _identifier(i),
+                "password_hash": password_hash,
+                "is_active": True,
+                "is_primary": True,
+            }
+            for i in range(users)
+        ])
+        db.execute(insert(user_roles), [
+            {"user_id": i + 1, "role_id": role.id}
+            for i in range(users)
+            for role in rng.sample(role_rows, min(roles_per_user, roles))
+        ])
+        rebuild_closure(db)
+        rebuild_all(db)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _percentiles(samples_ms: list[float]) -> dict:
+    ordered = sorted(samples_ms)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+    return {
+        "n": len(ordered),
+        "avg_ms": round(sum(ordered) / len(ordered), 3),
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+class _StatementCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args) -> None:
+        self.count += 1
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def bench_service(Session, counter: _StatementCounter, identifiers: list[str]) -> dict:
+    service = AuthService()
+    samples, statements = [], []
+    wall_start = time.perf_counter()
+    for identifier in identifiers:
+        db = Session()
+        before = counter.count
+        token, elapsed = _timed(lambda: service.login(db, identifier=identifier, password=PASSWORD))
+        db.close()
+        assert token, f"login failed for {identifier}"
+        samples.append(elapsed)
+        statements.append(counter.count - before)
+    wall = time.perf_counter() - wall_start
+
+    return {
+        **_percentiles(samples),
+        "logins_per_s": round(len(identifiers) / wall, 2),
+        "statements_per_login": round(sum(statements) / len(statements), 2),
+        "statements_max": max(statements),
+    }
+
+
+def bench_phases(Session, counter: _StatementCounter, identifiers: list[str]) -> dict:
+    """Replays AuthService.login step by step so each phase gets its own latency and statement count."""
+    service = AuthService()
+    phases = ("lookup", "argon2_verify", "accept", "role_perm_aggregation", "jwt_encode")
+    samples = {name: [] for name in phases}
+    statements = {name: 0 for name in phases}
+
+    def phase(name, fn):
+        before = counter.count
+        result, elapsed = _timed(fn)
+        samples[name].append(elapsed)
+        statements[name] += counter.count - before
+        return result
+
+    for identifier in identifiers:
+        db = Session()
+        identity = phase("lookup", lambda: service._lookup_identity(db, identifier, PASSWORD, None))
+        verified, new_hash = phase("argon2_verify", lambda: verify_and_update_password(PASSWORD, identity.password_hash, identity.provider))
+        assert verified
+        user = phase("accept", lambda: service._accept_identity(db, identity, new_hash))
+
+        def aggregate():
+            roles, perms, roles_version = service._load_roles_and_permissions(db, user.id)
+            perm_bits = perm_registry_version = None
+            if config.TOKEN_PERMS_FORMAT != "list":
+                bit_index, perm_registry_version = permission_registry.sync(db, roles_version)
+                perm_bits = encode_permission_bits(perms, bit_index)
+            return roles, perms, perm_bits, perm_registry_version
+
+        roles, perms, perm_bits, perm_registry_version = phase("role_perm_aggregation", aggregate)
+        phase("jwt_encode", lambda: issue_access_token(
+            sub=str(user.id), email=user.email or "", roles=roles, perms=perms,
+            perm_bits=perm_bits, perm_registry_version=perm_registry_version,
+        ))
+        db.close()
+
+    return {
+        name: {**_percentiles(samples[name]), "statements_per_login": round(statements[name] / len(identifiers), 2)}
+        for name in phases
+    }
+
+
+def bench_http(counter: _StatementCounter, identifiers: list[str]) -> dict:
+    from app import create_app  # the app reads the engine lazily, so it picks up the benchmark database
+
+    client = create_app().test_client()
+    samples, statements = [], []
+    wall_start = time.perf_counter()
+    for identifier in identifiers:
+        before = counter.count
+        resp, elapsed = _timed(lambda: client.post("/auth/login", json={"identifier": identifier, "password": PASSWORD}))
+        assert resp.status_code == 200, resp.get_data(as_text=True)
+        samples.append(elapsed)
+        statements.append(counter.count - before)
+    wall = time.perf_counter() - wall_start
+
+    return {
+        **_percentiles(samples),
+        "logins_per_s": round(len(identifiers) / wall, 2),
+        "statements_per_login": round(sum(statements) / len(statements), 2),
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--roles", type=int, default=20)
+    parser.add_argument("--perms", type=int, default=200)
+    parser.add_argument("--perms-per-role", type=int, default=25)
+    parser.add_argument("--roles-per-user", type=int, default=3)
+    parser.add_argument("--logins", type=int, default=200, help="logins per measurement")
+    parser.add_argument("--cold-cache", action="store_true", help="clear the role permission cache before each measurement")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--db", default="sqlite://", help="database URL (schema is dropped and recreated)")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    parser.add_argument("--out", default=None, help="also write the JSON results to this file")
+    args = parser.parse_args(argv)
+
+    # Repeated logins from one client would trip the login throttle; this measures the path behind it
+    config.RATE_LIMIT_ENABLED = False
+    rng = random.Random(args.seed)
+    engine, Session = make_sessionmaker(args.db)
+    seed(Session, args.users, args.roles, args.perms, args.perms_per_role, args.roles_per_user, rng)
+    # Route the app's request sessions at the benchmark database
+    db_base._engine = engine
+    counter = _StatementCounter(engine)
+
+    identifiers = [_identifier(rng.randrange(args.users)) for _ in range(args.logins)]
+    results = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "params": {k: v for k, v in vars(args).items() if k not in ("json", "out")},
+        "dialect": engine.dialect.name,
+        "token_perms_format": config.TOKEN_PERMS_FORMAT,
+    }
+    for name, bench in (
+        ("service_login", lambda: bench_service(Session, counter, identifiers)),
+        ("phases", lambda: bench_phases(Session, counter, identifiers)),
+        ("http_login", lambda: bench_http(counter, identifiers)),
+    ):
+        if args.cold_cache:
+            role_permission_cache.clear()
+        results[name] = bench()
+    engine.dispose()
+
+    if args.out:
+        with open(args.out, "w") as fh:
+            json.dump(results, fh, indent=2)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"commit {results['commit']}  dialect {results['dialect']}  params {results['params']}")
+    for name in ("service_login", "http_login"):
+        print(f"[{name}]")
+        for key, value in results[name].items():
+            print(f"  {key:<22} {value}")
+    print("[phases]")
+    for name, stats in results["phases"].items():
+        print(f"  {name:<22} p50 {stats['p50_ms']:>8} ms  p95 {stats['p95_ms']:>8} ms  p99 {stats['p99_ms']:>8} ms  stmts {stats['statements_per_login']}")
+
+
+if __name__ == "__main__":
+    run()
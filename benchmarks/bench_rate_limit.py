@@ -0,0 +1,47 @@
+"""Check that the in-memory login limiter stays flat in memory and latency under many distinct keys.
+
+Usage:
+    python -m benchmarks.bench_rate_limit [--keys 2000000] [--max-keys 200000]
+"""
+import argparse, json, time, tracemalloc
+from collections import deque
+from src.core.rate_limit import MemoryBucketStore, RateLimiter
+
+
+def run(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keys", type=int, default=2_000_000, help="distinct keys to send")
+    parser.add_argument("--max-keys", type=int, default=200_000, help="store capacity (RATE_LIMIT_MAX_KEYS)")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args(argv)
+
+    store = MemoryBucketStore(args.max_keys)
+    limiter = RateLimiter("bench", 10, 60, store)
+    checkpoints = {}
+    tracemalloc.start()
+    samples: deque = deque(maxlen=100_000)  # bounded, so traced memory is the store's
+    for i in range(args.keys):
+        start = time.perf_counter()
+        limiter.hit(f"user{i}@example.com")
+        samples.append(time.perf_counter() - start)
+        if (i + 1) in (args.max_keys, args.keys):
+            current, _ = tracemalloc.get_traced_memory()
+            window = sorted(samples)
+            checkpoints[i + 1] = {
+                "store_mib": round(current / 2**20, 1),
+                "p50_us": round(window[len(window) // 2] * 1e6, 2),
+                "p99_us": round(window[int(len(window) * 0.99)] * 1e6, 2),
+            }
+    tracemalloc.stop()
+
+    results = {"keys": args.keys, "max_keys": args.max_keys, "store": store.stats(), "after_keys": checkpoints}
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"keys {args.keys}  max_keys {args.max_keys}  evictions {store.evictions}")
+    for seen, stats in checkpoints.items():
+        print(f"  after {seen:>9} keys: {stats['store_mib']:>7} MiB traced  p50 {stats['p50_us']} us  p99 {stats['p99_us']} us")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,114 @@
+"""Benchmark role-closure maintenance and permission resolution on deep/wide hierarchies.
+
+Usage:
+    python -m benchmarks.bench_role_hierarchy [--depth 200] [--fanout 8 --levels 4] [--perms 5] [--db URL]
+"""
+import argparse, json, time
+from sqlalchemy import func, select
+from src.db.models import Role, Permission, User, role_closure
+from src.services.permission_cache import RolePermissionCache
+from src.services.role_hierarchy import add_inheritance, remove_inheritance
+from benchmarks._db import make_sessionmaker
+
+
+def _make_roles(db, prefix: str, count: int, perms_per_role: int) -> list[Role]:
+    roles = []
+    for i in range(count):
+        perms = [Permission(code=f"{prefix}{i}:p{j}") for j in range(perms_per_role)]
+        roles.append(Role(name=f"{prefix}{i}", permissions=perms))
+    db.add_all(roles)
+    db.commit()
+    return roles
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def _measure(db, name: str, roles: list[Role], edges: list[tuple[int, int]]) -> dict:
+    add_ms = [_timed(lambda e=e: (add_inheritance(db, *e), db.commit())) for e in edges]
+
+    top = roles[0]
+    user = User(full_name=f"{name}-user", roles=[top])
+    db.add(user)
+    db.commit()
+
+    cache = RolePermissionCache()
+    resolve_ms = [_timed(lambda: cache._load(db, [top.id])) for _ in range(20)]
+    perm_count = len(cache._load(db, [top.id])[top.id][1])
+
+    closure_rows = db.scalar(select(func.count()).select_from(role_closure))
+    middle = edges[len(edges) // 2]
+    remove_ms = _timed(lambda: (remove_inheritance(db, *middle), db.commit()))
+
+    return {
+        "hierarchy": name,
+        "roles": len(roles),
+        "edges": len(edges),
+        "closure_rows": closure_rows,
+        "top_role_permissions": perm_count,
+        "add_edge_avg_ms": round(sum(add_ms) / len(add_ms), 3),
+        "add_edge_max_ms": round(max(add_ms), 3),
+        "remove_middle_edge_ms": round(remove_ms, 3),
+        "resolve_top_role_avg_ms": round(sum(resolve_ms) / len(resolve_ms), 3),
+    }
+
+
+def bench_deep(Session, depth: int, perms: int) -> dict:
+    db = Session()
+    try:
+        roles = _make_roles(db, "deep", depth, perms)
+        # Insert bottom-up so each new edge extends an already-long chain
+        edges = [(roles[i].id, roles[i + 1].id) for i in reversed(range(depth - 1))]
+        return _measure(db, "deep", roles, edges)
+    finally:
+        db.close()
+
+
+def bench_wide(Session, fanout: int, levels: int, perms: int) -> dict:
+    db = Session()
+    try:
+        count = sum(fanout ** level for level in range(levels))
+        roles = _make_roles(db, "wide", count, perms)
+        # Node i's children are fanout*i+1 .. fanout*i+fanout
+        edges = [
+            (roles[(child - 1) // fanout].id, roles[child].id)
+            for child in range(1, count)
+        ]
+        return _measure(db, "wide", roles, edges)
+    finally:
+        db.close()
+
+
+def run(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--depth", type=int, default=200)
+    parser.add_argument("--fanout", type=int, default=8)
+    parser.add_argument("--levels", type=int, default=4)
+    parser.add_argument("--perms", type=int, default=5, help="permissions per role")
+    parser.add_argument("--db", default="sqlite://", help="database URL (schema is dropped and recreated)")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args(argv)
+
+    results = []
+    for bench in (
+        lambda S: bench_deep(S, args.depth, args.perms),
+        lambda S: bench_wide(S, args.fanout, args.levels, args.perms),
+    ):
+        engine, Session = make_sessionmaker(args.db)
+        results.append(bench(Session))
+        engine.dispose()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for result in results:
+        print(f"[{result.pop('hierarchy')}]")
+        for key, value in result.items():
+            print(f"  {key:<26} {value}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,71 @@
+"""Startup-time budget check: import the app and build it under `python -X importtime`.
+
+Exits non-zero if the cumulative import time exceeds the budget or if any
+module that should load lazily (hashing, JWT, crypto) is imported at startup.
+
+Usage:
+    python -m benchmarks.bench_startup [--budget-ms 1500] [--runs 3] [--top 10]
+"""
+import argparse, json, os, re, statistics, subprocess, sys
+
+
+# Only needed on first hash/verify/token; importing them at startup is a regression
+LAZY_MODULES = ("passlib", "argon2", "jwt", "cryptography")
+
+STARTUP_SNIPPET = "import app; app.create_app()"
+LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)$")
+
+
+def measure_once(cwd: str) -> tuple[int, dict[str, int]]:
+    """Return (total_us, {module: cumulative_us}) for one cold interpreter."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP_SNIPPET],
+        cwd=cwd, capture_output=True, text=True, check=True,
+    )
+    modules: dict[str, int] = {}
+    total = 0
+    for line in proc.stderr.splitlines():
+        match = LINE_RE.match(line)
+        if not match:
+            continue
+        _, cumulative, indent, module = match.groups()
+        modules[module] = int(cumulative)
+        if len(indent) == 1:  # top-level import
+            total += int(cumulative)
+    return total, modules
+
+
+def run(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    parser.add_argument("--runs", type=int, default=3, help="median of this many cold starts")
+    parser.add_argument("--top", type=int, default=10, help="slowest modules to list")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args(argv)
+
+    cwd = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    samples = [measure_once(cwd) for _ in range(args.runs)]
+    total_ms = statistics.median(total for total, _ in samples) / 1000
+    modules = samples[-1][1]
+    eager = sorted(m for m in modules if m.split(".")[0] in LAZY_MODULES)
+    slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[: args.top]
+
+    results = {
+        "total_import_ms": round(total_ms, 1),
+        "budget_ms": args.budget_ms,
+        "eagerly_imported_lazy_modules": eager,
+        "slowest_modules_ms": {module: round(us / 1000, 1) for module, us in slowest},
+    }
+    ok = total_ms <= args.budget_ms and not eager
+    results["ok"] = ok
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for key, value in results.items():
+            print(f"  {key:<30} {value}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run())
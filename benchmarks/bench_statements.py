@@ -0,0 +1,109 @@
+"""Measure what prebuilt login statements, the compiled cache and prepared statements save per login.
+
+Runs the login's database reads (identity lookup, user roles, role permissions)
+under several engine configurations against the same seeded database:
+
+  rebuilt_uncached   statement rebuilt per login, query_cache_size=0 (compile every time)
+  rebuilt_cached     statement rebuilt per login, compiled cache on
+  prebuilt_cached    statements built once (current code), compiled cache on
+  prebuilt_prepared  as above plus psycopg server-side prepare (postgresql+psycopg URLs only)
+
+Usage:
+    python -m benchmarks.bench_statements [--logins 2000] [--db postgresql+psycopg://localhost/bench]
+"""
+import argparse, json, os, random, tempfile, time
+from src.core.config import config
+from src.db.models import ProviderEnum
+from src.services import auth_service as auth_module
+from src.services.auth_service import AuthService
+from src.services.permission_cache import RolePermissionCache
+from benchmarks._db import make_sessionmaker
+from benchmarks.bench_login import _identifier, seed
+
+
+def _run(Session, identifiers: list[str], rebuild: bool) -> dict:
+    service = AuthService()
+    providers = (ProviderEnum.email,)
+    lookup = auth_module._identity_lookup_stmt
+    samples = []
+    db = Session()
+    try:
+        for identifier in identifiers:
+            cache = RolePermissionCache()  # cold, so the role permission statement runs every time
+            start = time.perf_counter()
+            stmt = lookup.__wrapped__(providers) if rebuild else lookup(providers)
+            identity = db.scalar(stmt, {"ident_0": identifier})
+            rows = db.execute(auth_module._USER_ROLES_STMT, {"user_id": identity.user_id}).all()
+            cache.get_many(db, [role_id for role_id, _ in rows], rows[0][1] or 0)
+            samples.append((time.perf_counter() - start) * 1_000_000)
+            db.rollback()
+    finally:
+        db.close()
+
+    samples.sort()
+    return {
+        "avg_us": round(sum(samples) / len(samples), 1),
+        "p50_us": round(samples[len(samples) // 2], 1),
+        "p95_us": round(samples[int(len(samples) * 0.95)], 1),
+    }
+
+
+def run(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--roles", type=int, default=20)
+    parser.add_argument("--perms", type=int, default=200)
+    parser.add_argument("--logins", type=int, default=2000)
+    parser.add_argument("--db", default=None, help="database URL (schema is dropped and recreated); temp SQLite file by default")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args(argv)
+
+    tmp_path = None
+    url = args.db
+    if url is None:
+        fd, tmp_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        url = f"sqlite:///{tmp_path}"
+
+    rng = random.Random(0)
+    engine, Session = make_sessionmaker(url)
+    seed(Session, args.users, args.roles, args.perms, 25, 3, rng)
+    engine.dispose()
+    identifiers = [_identifier(rng.randrange(args.users)) for _ in range(args.logins)]
+
+    variants = [
+        ("rebuilt_uncached", True, {"query_cache_size": 0}),
+        ("rebuilt_cached", True, {"query_cache_size": config.DB_QUERY_CACHE_SIZE}),
+        ("prebuilt_cached", False, {"query_cache_size": config.DB_QUERY_CACHE_SIZE}),
+    ]
+    if url.startswith("postgresql+psycopg"):
+        # Server-side prepare skips Postgres parse/plan on repeat executions
+        variants[2][2]["connect_args"] = {"prepare_threshold": None}
+        variants.append(("prebuilt_prepared", False, {
+            "query_cache_size": config.DB_QUERY_CACHE_SIZE,
+            "connect_args": {"prepare_threshold": 0},
+        }))
+
+    results = {"dialect": engine.dialect.name, "logins": args.logins, "variants": {}}
+    for name, rebuild, engine_kwargs in variants:
+        engine, Session = make_sessionmaker(url, drop=False, **engine_kwargs)
+        _run(Session, identifiers[:50], rebuild)  # warm connections and caches
+        results["variants"][name] = _run(Session, identifiers, rebuild)
+        engine.dispose()
+
+    baseline = results["variants"]["rebuilt_uncached"]["avg_us"]
+    for stats in results["variants"].values():
+        stats["saved_vs_uncached_us"] = round(baseline - stats["avg_us"], 1)
+    if tmp_path:
+        os.remove(tmp_path)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"dialect {results['dialect']}  logins {results['logins']}  (login DB reads, per login)")
+    for name, stats in results["variants"].items():
+        print(f"  {name:<18} avg {stats['avg_us']:>8} us  p50 {stats['p50_us']:>8} us  p95 {stats['p95_us']:>8} us  saved {stats['saved_vs_uncached_us']:>7} us")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,52 @@
+"""Compare access-token verification throughput with and without the verified-token cache.
+
+Usage:
+    python -m benchmarks.bench_token_cache [--tokens 100] [--iterations 50000]
+"""
+import argparse, json, time
+from src.api.auth_middleware import TokenCache
+from src.core.jwt_tools import decode_access_token, issue_access_token
+
+
+def _throughput(fn, tokens: list[str], iterations: int) -> float:
+    start = time.perf_counter()
+    for i in range(iterations):
+        fn(tokens[i % len(tokens)])
+    return iterations / (time.perf_counter() - start)
+
+
+def run(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=100, help="distinct hot tokens")
+    parser.add_argument("--perms", type=int, default=30, help="permission codes per token")
+    parser.add_argument("--iterations", type=int, default=50000)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args(argv)
+
+    perms = [f"resource{i}:read" for i in range(args.perms)]
+    tokens = [issue_access_token(sub=str(i), email="", roles=["staff"], perms=perms) for i in range(args.tokens)]
+
+    cache = TokenCache(max_size=args.tokens)
+    for token in tokens:
+        cache.verify(token)  # warm
+
+    uncached = _throughput(decode_access_token, tokens, args.iterations)
+    cached = _throughput(cache.verify, tokens, args.iterations)
+    results = {
+        "tokens": args.tokens,
+        "iterations": args.iterations,
+        "uncached_ops_per_s": round(uncached),
+        "cached_ops_per_s": round(cached),
+        "speedup": round(cached / uncached, 2),
+        "cache": cache.stats(),
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for key, value in results.items():
+        print(f"  {key:<20} {value}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,145 @@
+import hashlib, threading, time
+from collections import OrderedDict
+from functools import wraps
+from typing import Iterable, Optional
+from flask import Flask, g, jsonify, request
+from src.core.config import config
+from src.core.jwt_tools import decode_access_token
+from src.core.perm_bits import PermissionBits
+from src.db.base import get_request_db, SessionLocal
+from src.services.permission_registry import permission_registry
+from src.services.revocation import revocation_list
+from src.services.token_versions import token_version_map
+
+
+class AuthContext:
+    """Verified claims of the current request's bearer token."""
+
+    def __init__(self, claims: dict):
+        self.claims = claims
+        self.user_id = claims.get("sub")
+        self.roles = frozenset(claims.get("roles") or ())
+        self.perms = frozenset(claims["perms"]) if "perms" in claims else None
+        self._bits: Optional[PermissionBits] = None
+
+    def _permission_bits(self) -> PermissionBits:
+        if self._bits is None:
+            bit_index, version = permission_registry.snapshot()
+            if version < self.claims.get("pver", 0):
+                # Token minted against permissions this process has not loaded yet
+                bit_index, _ = permission_registry.sync_latest(get_request_db())
+            self._bits = PermissionBits.from_claims(self.claims, bit_index)
+        return self._bits
+
+    def has_perms(self, codes: Iterable[str]) -> bool:
+        if self.perms is not None:
+            return self.perms.issuperset(codes)
+        return self._permission_bits().has_all(codes)
+
+    def permission_codes(self) -> list[str]:
+        if self.perms is not None:
+            return sorted(self.perms)
+        return self._permission_bits().codes()
+
+    def has_roles(self, names: Iterable[str]) -> bool:
+        return self.roles.issuperset(names)
+
+
+class TokenCache:
+    """Bounded LRU of verified tokens, keyed by SHA-256 digest and dropped at `exp`.
+
+    A hit skips the HMAC/signature check entirely; raw tokens are never stored.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[bytes, tuple[float, AuthContext]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def verify(self, token: str) -> Optional[AuthContext]:
+        key = hashlib.sha256(token.encode("utf-8")).digest()
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+            self.misses += 1
+
+        claims = decode_access_token(token)
+        if claims is None:
+            return None
+        ctx = AuthContext(claims)
+        with self._lock:
+            self._entries[key] = (claims.get("exp", now), ctx)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return ctx
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), "max_size": self.max_size, "hits": self.hits, "misses": self.misses}
+
+
+token_cache = TokenCache(config.TOKEN_CACHE_SIZE)
+
+
+def _authenticate() -> None:
+    g.auth = None
+    header = request.headers.get("Authorization", "")
+    scheme, _, token = header.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        revocation_list.maybe_sync(SessionLocal)
+        token_version_map.maybe_sync(SessionLocal)
+        auth = token_cache.verify(token.strip())
+        # Checked on cache hits too: revocation must win over a cached verification
+        if (
+            auth is not None
+            and not revocation_list.is_revoked(auth.claims.get("jti"))
+            and token_version_map.is_current(auth.user_id, auth.claims.get("tv", 0))
+        ):
+            g.auth = auth
+
+
+def init_auth(app: Flask) -> None:
+    """Attach `g.auth` (AuthContext or None) to every request."""
+    app.before_request(_authenticate)
+
+
+def _guard(check):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            auth: Optional[AuthContext] = g.get("auth")
+            if auth is None:
+                return jsonify({"details": "Authentication required"}), 401
+            if not check(auth):
+                return jsonify({"details": "Forbidden"}), 403
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def require_auth(view):
+    """Reject the request unless it carries a valid bearer token."""
+    return _guard(lambda auth: True)(view)
+
+
+def require_perms(*codes: str):
+    """Reject the request unless the token grants every permission code given."""
+    return _guard(lambda auth: auth.has_perms(codes))
+
+
+def require_roles(*names: str):
+    """Reject the request unless the token carries every role name given."""
+    return _guard(lambda auth: auth.has_roles(names))
@@ -0,0 +1,41 @@
+import time
+from flask import Flask, Response, g, request
+from src.core import metrics as m
+from src.core.config import config
+
+
+# Blueprints whose Server-Timing header carries the total only; their phases still reach /metrics
+_PHASES_HIDDEN_BLUEPRINTS = frozenset({"auth"})
+
+
+def _start() -> None:
+    g.metrics_token = m.start_request()
+    g.metrics_start = time.perf_counter()
+
+
+def _finish(response: Response) -> Response:
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    m.metrics.inc("requests_total", (endpoint, str(response.status_code)))
+
+    timings = m.finish_request(g.pop("metrics_token", None))
+    if timings is not None:
+        total = time.perf_counter() - g.metrics_start
+        m.metrics.observe("request_duration_seconds", (endpoint,), total)
+        if config.SERVER_TIMING_ENABLED:
+            # An argon2 entry would show whether a failed login named a real account
+            phases = {} if request.blueprint in _PHASES_HIDDEN_BLUEPRINTS else timings
+            response.headers["Server-Timing"] = m.server_timing_header(phases, total)
+    return response
+
+
+def _discard(exc=None) -> None:
+    # after_request is skipped for unhandled errors; never leak timings into the next request
+    m.finish_request(g.pop("metrics_token", None))
+
+
+def init_metrics(app: Flask) -> None:
+    """Time sampled requests (SQL, Argon2, JWT) and count all of them. Register before other hooks."""
+    m.instrument_engines()
+    app.before_request(_start)
+    app.after_request(_finish)
+    app.teardown_request(_discard)
@@ -0,0 +1,154 @@
+import hashlib
+from flask import Blueprint, Response, jsonify, request
+from sqlalchemy.orm import Session
+from src.api.auth_middleware import require_perms
+from src.db.base import get_request_db
+from src.db.models import ProviderEnum
+from src.services.role_assignment import RoleAssignmentError, change_role_membership
+from src.services.user_directory import MAX_PAGE_SIZE, list_roles, list_users
+
+
+bp_admin = Blueprint("admin", __name__, url_prefix="/admin")
+
+
+def _page_args() -> tuple[int, int]:
+    after = request.args.get("after", 0, type=int)
+    limit = request.args.get("limit", 50, type=int)
+    return max(0, after), min(max(1, limit), MAX_PAGE_SIZE)
+
+
+def _bool_arg(name: str):
+    raw = request.args.get(name)
+    if raw is None:
+        return None
+    if raw.lower() in ("1", "true", "yes"):
+        return True
+    if raw.lower() in ("0", "false", "no"):
+        return False
+    raise ValueError(name)
+
+
+def _conditional(fingerprint, build_body) -> Response:
+    """304 if the client's weak ETag matches `fingerprint`; otherwise serialize the page."""
+    etag = hashlib.blake2b(repr(fingerprint).encode("utf-8"), digest_size=16).hexdigest()
+    if request.if_none_match.contains_weak(etag):
+        resp = Response(status=304)
+    else:
+        resp = jsonify(build_body())
+    resp.set_etag(etag, weak=True)
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp
+
+
+@bp_admin.route("/users", methods=["GET"])
+@require_perms("user:read")
+def users():
+    """Users with their identities and role names, keyset-paginated on id (?after=<next_after>)."""
+    try:
+        after, limit = _page_args()
+        provider = ProviderEnum(request.args["provider"]) if "provider" in request.args else None
+        is_active = _bool_arg("is_active")
+    except ValueError:
+        return jsonify({"details": "Invalid query parameters"}), 400
+
+    db: Session = get_request_db()
+    page, next_after = list_users(db, after=after, limit=limit, provider=provider, is_active=is_active)
+
+    rows = [
+        (
+            user,
+            [(i.id, i.provider.value, i.identifier, i.is_active, i.is_primary) for i in user.identities],
+            sorted(role.name for role in user.roles),
+        )
+        for user in page
+    ]
+    fingerprint = (
+        next_after,
+        [(u.id, u.full_name, u.email, u.is_active, u.last_login_at, idents, roles) for u, idents, roles in rows],
+    )
+
+    def body():
+        return {
+            "items": [
+                {
+                    "id": user.id,
+                    "full_name": user.full_name,
+                    "email": user.email,
+                    "is_active": user.is_active,
+                    "last_login_at": user.last_login_at.isoformat() if user.last_login_at else None,
+                    "identities": [
+                        {"id": ident_id, "provider": prov, "identifier": ident, "is_active": active, "is_primary": primary}
+                        for ident_id, prov, ident, active, primary in idents
+                    ],
+                    "roles": roles,
+                }
+                for user, idents, roles in rows
+            ],
+            "next_after": next_after,
+        }
+
+    return _conditional(fingerprint, body)
+
+
+@bp_admin.route("/roles", methods=["GET"])
+@require_perms("user:read")
+def roles():
+    """Roles with their direct permission codes, keyset-paginated on id."""
+    after, limit = _page_args()
+    db: Session = get_request_db()
+    page, next_after = list_roles(db, after=after, limit=limit)
+
+    rows = [(role.id, role.name, role.description, sorted(p.code for p in role.permissions)) for role in page]
+
+    def body():
+        return {
+            "items": [
+                {"id": role_id, "name": name, "description": description, "permissions": codes}
+                for role_id, name, description, codes in rows
+            ],
+            "next_after": next_after,
+        }
+
+    return _conditional((next_after, rows), body)
+
+
+@bp_admin.route("/role-assignments", methods=["POST"])
+@require_perms("user:assign-role")
+def role_assignments():
+    """Assign or revoke one role for many users at once.
+
+    Body: {"role": "frontdesk", "action": "assign"|"revoke", "user_ids": [...],
+           "provider": "room", "identifiers": [...], "identifier_prefix": "3"}
+    """
+    data = request.get_json(force=True) or {}
+    try:
+        provider = ProviderEnum(data["provider"]) if data.get("provider") else None
+    except (ValueError, TypeError):
+        return jsonify({"details": "Invalid provider"}), 400
+    # Strings are iterable too: "23" must not turn into users 2 and 3
+    user_ids = data.get("user_ids") or []
+    if not isinstance(user_ids, list) or not all(type(uid) is int for uid in user_ids):
+        return jsonify({"details": "user_ids must be a list of integers"}), 400
+    identifiers = data.get("identifiers") or []
+    if not isinstance(identifiers, list) or not all(isinstance(ident, str) for ident in identifiers):
+        return jsonify({"details": "identifiers must be a list of strings"}), 400
+    identifier_prefix = data.get("identifier_prefix")
+    if identifier_prefix is not None and not isinstance(identifier_prefix, str):
+        return jsonify({"details": "identifier_prefix must be a string"}), 400
+
+    db: Session = get_request_db()
+    try:
+        result = change_role_membership(
+            db,
+            role_name=data.get("role") or "",
+            action=data.get("action") or "",
+            user_ids=user_ids,
+            provider=provider,
+            identifiers=identifiers,
+            identifier_prefix=identifier_prefix,
+        )
+    except RoleAssignmentError as exc:
+        db.rollback()
+        return jsonify({"details": str(exc)}), 400
+    db.commit()
+    return jsonify(result)
@@ -1,8 +1,16 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, g, request, jsonify
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from src.db.base import get_db
+from src.db.base import get_request_db
 from src.services.auth_service import AuthService
-from src.db.models import ProviderEnum
+from src.db.models import ProviderEnum, RefreshToken
+from src.services.refresh_tokens import hash_refresh_token, revoke_family
+from src.services.revocation import revocation_list
+from src.services.permission_registry import permission_registry
+from src.core.config import config
+from src.core.keys import keyring
+from src.api.auth_middleware import require_auth, require_perms
+from src.services.authorization import MAX_PAIRS, authorize_pairs
 
 
 bp_auth = Blueprint("auth", __name__, url_prefix="/auth")
@@ -11,7 +19,7 @@ auth_service = AuthService()
 
 @bp_auth.route("/login", methods=["POST"])
 def login():
-    db: Session = next(get_db())
+    db: Session = get_request_db()
     data = request.get_json(force=True) or {}
     identifier = data.get("identifier")
     password = data.get("password")
@@ -25,12 +33,99 @@ def login():
         except ValueError:
             provider_enum = None
     
-    token = auth_service.login(
+    tokens = auth_service.login_with_refresh(
         db,
         identifier=identifier,
         password=password,
         provider=provider_enum,
+        client_ip=request.remote_addr,
     )
 
-    if not token: return jsonify({"details": "Invalid credentials"}), 401
-    return jsonify({"access_token": token, "token_type": "bearer"})
\ No newline at end of file
+    if not tokens: return jsonify({"details": "Invalid credentials"}), 401
+    access_token, refresh_token = tokens
+    return jsonify({"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"})
+
+
+@bp_auth.route("/refresh", methods=["POST"])
+def refresh():
+    db: Session = get_request_db()
+    data = request.get_json(force=True) or {}
+
+    tokens = auth_service.refresh(db, data.get("refresh_token"))
+
+    if not tokens: return jsonify({"details": "Invalid refresh token"}), 401
+    access_token, refresh_token = tokens
+    return jsonify({"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"})
+
+
+@bp_auth.route("/logout", methods=["POST"])
+def logout():
+    """Revoke the presented refresh token's family and the bearer access token, if any."""
+    db: Session = get_request_db()
+    data = request.get_json(silent=True) or {}
+
+    refresh_token = data.get("refresh_token")
+    if refresh_token:
+        row = db.scalar(select(RefreshToken).where(RefreshToken.token_hash == hash_refresh_token(refresh_token)))
+        if row:
+            revoke_family(db, row.family_id)
+
+    auth = g.get("auth")
+    if auth is not None and auth.claims.get("jti"):
+        revocation_list.revoke(db, auth.claims["jti"], auth.claims["exp"])
+
+    db.commit()
+    return "", 204
+
+
+@bp_auth.route("/me", methods=["GET"])
+@require_auth
+def me():
+    """The caller's identity, roles and permissions, straight from the verified token (no DB reads)."""
+    auth = g.auth
+    return jsonify({
+        "user_id": int(auth.user_id),
+        "email": auth.claims.get("email") or None,
+        "roles": sorted(auth.roles),
+        "permissions": auth.permission_codes(),
+        "expires_at": auth.claims.get("exp"),
+    })
+
+
+@bp_auth.route("/authorize", methods=["POST"])
+@require_perms("user:read")
+def authorize():
+    """Batch "can user X do P?" answers from current data rather than token claims.
+
+    Body: {"checks": [{"user_id": 1, "permission": "user:read"}, ...]} -> {"decisions": [true, ...]}
+    """
+    data = request.get_json(force=True) or {}
+    checks = data.get("checks")
+    if not isinstance(checks, list) or len(checks) > MAX_PAIRS:
+        return jsonify({"details": f"checks must be a list of at most {MAX_PAIRS} items"}), 400
+    try:
+        pairs = [(int(check["user_id"]), str(check["permission"])) for check in checks]
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"details": "Each check needs user_id and permission"}), 400
+
+    db: Session = get_request_db()
+    return jsonify({"decisions": authorize_pairs(db, pairs)})
+
+
+@bp_auth.route("/permissions/registry", methods=["GET"])
+def permission_bit_registry():
+    """Code -> bit mapping needed to decode `pbits` claims (codes[i] owns bit i)."""
+    db: Session = get_request_db()
+    permission_registry.sync_latest(db)
+    resp = jsonify(permission_registry.as_dict())
+    resp.headers["Cache-Control"] = "public, max-age=60"
+    return resp
+
+
+@bp_auth.route("/.well-known/jwks.json", methods=["GET"])
+def jwks():
+    """Public keys for verifying access tokens offline."""
+    resp = jsonify(keyring.jwks())
+    resp.headers["Cache-Control"] = f"public, max-age={config.JWKS_MAX_AGE_S}"
+    resp.add_etag()
+    return resp.make_conditional(request)
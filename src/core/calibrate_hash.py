@@ -0,0 +1,99 @@
+"""Benchmark argon2 parameters on this host and write a hash policy file.
+
+Usage:
+    python -m src.core.calibrate_hash --target-ms 250 --provider room=60 --out hash_policy.json
+
+The default policy targets --target-ms; each --provider NAME=MS entry gets its
+own policy tuned to that latency budget (e.g. a cheaper one for room PINs).
+"""
+import argparse, json, statistics, time
+from passlib.hash import argon2
+from src.core.config import config
+from src.db.models import ProviderEnum
+
+
+MIN_MEMORY_KIB = 8 * 1024
+
+
+def measure_ms(time_cost: int, memory_cost: int, parallelism: int, samples: int = 3) -> float:
+    """Median wall time of one argon2 hash with the given parameters."""
+    handler = argon2.using(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        handler.hash("calibration-password")
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(target_ms: float, *, parallelism: int, max_memory_kib: int, max_time_cost: int = 10) -> dict:
+    """Pick the strongest (memory_cost x time_cost) pair that hashes within target_ms."""
+    best = None
+    memory_cost = MIN_MEMORY_KIB
+    while memory_cost <= max_memory_kib:
+        fits = False
+        for time_cost in range(1, max_time_cost + 1):
+            elapsed = measure_ms(time_cost, memory_cost, parallelism)
+            if elapsed > target_ms:
+                break
+            fits = True
+            strength = memory_cost * time_cost
+            if best is None or strength > best["memory_cost"] * best["time_cost"]:
+                best = {
+                    "time_cost": time_cost,
+                    "memory_cost": memory_cost,
+                    "parallelism": parallelism,
+                    "measured_ms": round(elapsed, 2),
+                }
+        if not fits:
+            break  # more memory will only be slower
+        memory_cost *= 2
+
+    if best is None:
+        # Even the cheapest setting misses the budget; report it so the operator can decide
+        best = {
+            "time_cost": 1,
+            "memory_cost": MIN_MEMORY_KIB,
+            "parallelism": parallelism,
+            "measured_ms": round(measure_ms(1, MIN_MEMORY_KIB, parallelism), 2),
+        }
+    best["target_ms"] = target_ms
+    return best
+
+
+def _parse_provider_budget(raw: str) -> tuple[str, float]:
+    name, _, ms = raw.partition("=")
+    try:
+        provider = ProviderEnum(name.strip())
+        return provider.value, float(ms)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected PROVIDER=MS with a valid provider, got {raw!r}")
+
+
+def run(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target-ms", type=float, default=250.0, help="latency budget for the default policy")
+    parser.add_argument("--provider", type=_parse_provider_budget, action="append", default=[],
+                        help="per-provider budget, e.g. room=60 (repeatable)")
+    parser.add_argument("--parallelism", type=int, default=1)
+    parser.add_argument("--max-memory-mib", type=int, default=256)
+    parser.add_argument("--out", default=config.HASH_POLICY_FILE)
+    args = parser.parse_args(argv)
+
+    max_memory_kib = args.max_memory_mib * 1024
+    policy = {
+        "default": calibrate(args.target_ms, parallelism=args.parallelism, max_memory_kib=max_memory_kib),
+        "providers": {
+            provider: calibrate(budget, parallelism=args.parallelism, max_memory_kib=max_memory_kib)
+            for provider, budget in args.provider
+        },
+    }
+
+    with open(args.out, "w") as fh:
+        json.dump(policy, fh, indent=2)
+    print(json.dumps(policy, indent=2))
+    print(f"Hash policy written to {args.out}")
+
+
+if __name__ == "__main__":
+    run()
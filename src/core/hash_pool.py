@@ -0,0 +1,136 @@
+import os, threading, time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from src.core.config import config
+
+
+class HashPoolSaturated(Exception):
+    """Raised when the hashing pool has no free worker or queue slot."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing pool is saturated")
+        self.retry_after = retry_after
+
+
+def _timed_call(fn: Callable, *args) -> tuple[float, Any]:
+    # time.monotonic is system-wide, so the start time is comparable across processes
+    return time.monotonic(), fn(*args)
+
+
+class HashPool:
+    """Bounded worker pool for CPU-bound password hashing and verification.
+
+    At most `workers + max_queue` jobs are admitted at once; anything beyond
+    that is rejected immediately instead of queueing up behind the workers.
+    """
+
+    def __init__(self, kind: str = "thread", workers: int = 2, max_queue: int = 32, retry_after: int = 1):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown hash pool kind: {kind!r}")
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.retry_after = retry_after
+
+        self._executor: Optional[Executor] = None
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_queue)
+        self._lock = threading.Lock()
+
+        # Counters for sizing the pool
+        self._in_flight = 0
+        self._submitted = 0
+        self._rejected = 0
+        self._completed = 0
+        self._wait_total_s = 0.0
+        self._wait_max_s = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.kind == "process":
+                        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    else:
+                        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hash")
+        return self._executor
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """Queue `fn(*args)` on the pool, raising HashPoolSaturated if it is full."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HashPoolSaturated(self.retry_after)
+
+        with self._lock:
+            self._in_flight += 1
+            self._submitted += 1
+
+        enqueued_at = time.monotonic()
+        result: Future = Future()
+
+        def _done(inner: Future) -> None:
+            self._slots.release()
+            with self._lock:
+                self._in_flight -= 1
+                self._completed += 1
+            exc = inner.exception()
+            if exc is not None:
+                result.set_exception(exc)
+                return
+            started_at, value = inner.result()
+            wait = max(0.0, started_at - enqueued_at)
+            with self._lock:
+                self._wait_total_s += wait
+                self._wait_max_s = max(self._wait_max_s, wait)
+            result.set_result(value)
+
+        try:
+            inner = self._get_executor().submit(_timed_call, fn, *args)
+        except BaseException:
+            self._slots.release()
+            with self._lock:
+                self._in_flight -= 1
+            raise
+        inner.add_done_callback(_done)
+        return result
+
+    def run(self, fn: Callable, *args) -> Any:
+        """Run `fn(*args)` on the pool and block until it returns."""
+        return self.submit(fn, *args).result()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "kind": self.kind,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "queue_depth": max(0, self._in_flight - self.workers),
+                "submitted": self._submitted,
+                "rejected": self._rejected,
+                "completed": self._completed,
+                "wait_avg_ms": (self._wait_total_s / self._completed * 1000) if self._completed else 0.0,
+                "wait_max_ms": self._wait_max_s * 1000,
+            }
+
+    def reset_after_fork(self) -> None:
+        # Worker threads/processes and lock state do not survive fork(); start clean in the child
+        self._executor = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_queue)
+        self._in_flight = 0
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+hash_pool = HashPool(
+    kind=config.HASH_POOL_KIND,
+    workers=config.HASH_POOL_WORKERS,
+    max_queue=config.HASH_POOL_MAX_QUEUE,
+    retry_after=config.HASH_POOL_RETRY_AFTER_S,
+)
+os.register_at_fork(after_in_child=hash_pool.reset_after_fork)
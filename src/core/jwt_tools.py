@@ -1,25 +1,59 @@
-import time, jwt
+import secrets, time
 from typing import Optional
 from src.core.config import config
+from src.core.keys import keyring
+from src.core.metrics import timed
 
 
-def issue_access_token(sub: int, email: str, roles: list[str], perms: list[str]) -> str:
+@timed("jwt")
+def issue_access_token(
+    sub: int,
+    email: str,
+    roles: list[str],
+    perms: list[str],
+    perm_bits: Optional[str] = None,
+    perm_registry_version: Optional[int] = None,
+    token_version: int = 0,
+) -> str:
+    import jwt  # deferred: PyJWT is only needed once the first token is issued
+
     now = int(time.time())
     payload = {
         "sub": sub,
         "email": email,
         "roles": roles,
-        "perms": perms,
-        "iat": now,
-        "exp": now + config.ACCESS_TOKEN_EXPIRES_MIN * 60,
+        "tv": token_version,  # checked against users.token_version, see src.services.token_versions
     }
-    token = jwt.encode(payload, config.SECRET_KEY, algorithm="HS256")
+    if config.TOKEN_PERMS_FORMAT in ("list", "both") or perm_bits is None:
+        payload["perms"] = perms
+    if config.TOKEN_PERMS_FORMAT in ("bitset", "both") and perm_bits is not None:
+        # Compact form, see src.core.perm_bits.PermissionBits
+        payload["pbits"] = perm_bits
+        payload["pver"] = perm_registry_version
+    payload["iat"] = now
+    payload["exp"] = now + config.ACCESS_TOKEN_EXPIRES_MIN * 60
+    payload["jti"] = secrets.token_hex(16)  # revocation handle, see src.services.revocation
+    if config.JWT_ALGORITHM == "HS256":
+        return jwt.encode(payload, config.SECRET_KEY, algorithm="HS256")
+
+    kid, key, algorithm = keyring.signing_key()
+    token = jwt.encode(payload, key, algorithm=algorithm, headers={"kid": kid})
     return token
 
 
 def decode_access_token(token: str) -> Optional[dict]:
+    import jwt
+
     try:
-        payload = jwt.decode(token, config.SECRET_KEY, algorithms=["HS256"])
+        if config.JWT_ALGORITHM == "HS256":
+            return jwt.decode(token, config.SECRET_KEY, algorithms=["HS256"])
+
+        # Key (and with it the algorithm) is chosen by kid, never by the token's own alg header
+        found = keyring.verification_key(jwt.get_unverified_header(token).get("kid", ""))
+        if found is None:
+            return None
+        key, algorithm = found
+        payload = jwt.decode(token, key, algorithms=[algorithm])
         return payload
     except jwt.PyJWTError:
-        return None
\ No newline at end of file
+        return None
@@ -0,0 +1,171 @@
+"""Asymmetric signing keys for access tokens.
+
+Every `<kid>.pem` private key in JWT_KEYS_DIR can verify tokens and is
+published in the JWKS; `<kid>.pub.pem` files are verification-only (keys
+being retired). Generate a new key with:
+
+    python -m src.core.keys --alg EdDSA
+"""
+import argparse, json, os, secrets, threading, time
+from typing import Optional
+from src.core.config import config
+
+# cryptography and PyJWT are imported on first use to keep app startup light
+
+
+class KeyRingError(Exception):
+    """Raised when no usable signing key is configured."""
+
+
+def _algorithm_for(public_key) -> str:
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+    if isinstance(public_key, ed25519.Ed25519PublicKey):
+        return "EdDSA"
+    if isinstance(public_key, ec.EllipticCurvePublicKey) and public_key.curve.name == "secp256r1":
+        return "ES256"
+    raise KeyRingError(f"Unsupported key type: {type(public_key).__name__}")
+
+
+class KeyRing:
+    """Keys loaded from a directory, reloaded when the directory changes.
+
+    The signing key is JWT_ACTIVE_KID if set, otherwise the newest private key
+    that has been published for at least JWKS_MAX_AGE_S. The choice is revisited
+    when a newer key reaches that age, even if the directory has not changed.
+    """
+
+    def __init__(self, directory: str, active_kid: Optional[str] = None):
+        self.directory = directory
+        self.active_kid = active_kid
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._private: dict[str, object] = {}
+        self._public: dict[str, object] = {}
+        self._signing_kid: Optional[str] = None
+        self._created: dict[str, float] = {}
+        self._settle_at: Optional[float] = None  # when the next newer key becomes eligible to sign
+
+    def _maybe_reload(self) -> None:
+        try:
+            mtime = os.stat(self.directory).st_mtime
+        except FileNotFoundError:
+            mtime = None
+        settled = self._settle_at is not None and time.time() >= self._settle_at
+        if mtime == self._mtime and self._public and not settled:
+            return
+        with self._lock:
+            if mtime != self._mtime or not self._public:
+                self._load()
+                self._mtime = mtime
+            elif not self.active_kid:
+                self._signing_kid, self._settle_at = self._pick_signing_kid(self._created)
+
+    def _load(self) -> None:
+        from cryptography.hazmat.primitives import serialization
+
+        private, public, created = {}, {}, {}
+        names = sorted(os.listdir(self.directory)) if os.path.isdir(self.directory) else []
+        for name in names:
+            path = os.path.join(self.directory, name)
+            with open(path, "rb") as fh:
+                data = fh.read()
+            if name.endswith(".pub.pem"):
+                kid = name[: -len(".pub.pem")]
+                public[kid] = serialization.load_pem_public_key(data)
+            elif name.endswith(".pem"):
+                kid = name[: -len(".pem")]
+                private[kid] = serialization.load_pem_private_key(data, password=None)
+                public[kid] = private[kid].public_key()
+                created[kid] = os.stat(path).st_mtime
+            else:
+                continue
+            _algorithm_for(public[kid])
+
+        signing_kid, settle_at = (self.active_kid, None) if self.active_kid else self._pick_signing_kid(created)
+        self._private, self._public, self._created = private, public, created
+        self._signing_kid, self._settle_at = signing_kid, settle_at
+
+    def _pick_signing_kid(self, created: dict[str, float]) -> tuple[Optional[str], Optional[float]]:
+        """Return (signing kid, time the next unsettled key settles or None)."""
+        # A new key is only used for signing once it has been in the JWKS for a full
+        # cache lifetime, so downstream verifiers already know it
+        if not created:
+            return None, None
+        published_before = time.time() - config.JWKS_MAX_AGE_S
+        settled = [kid for kid, mtime in created.items() if mtime <= published_before]
+        candidates = settled or list(created)
+        pending = [mtime + config.JWKS_MAX_AGE_S for mtime in created.values() if mtime > published_before]
+        return max(candidates, key=lambda kid: (created[kid], kid)), min(pending, default=None)
+
+    def signing_key(self) -> tuple[str, object, str]:
+        """Return (kid, private_key, algorithm) for new tokens."""
+        self._maybe_reload()
+        kid = self._signing_kid
+        if kid is None or kid not in self._private:
+            raise KeyRingError(f"No signing key {kid or ''!s} in {self.directory}")
+        key = self._private[kid]
+        return kid, key, _algorithm_for(key.public_key())
+
+    def verification_key(self, kid: str) -> Optional[tuple[object, str]]:
+        """Return (public_key, algorithm) for a token's `kid`, or None if unknown."""
+        self._maybe_reload()
+        key = self._public.get(kid)
+        return (key, _algorithm_for(key)) if key is not None else None
+
+    def jwks(self) -> dict:
+        from jwt.algorithms import ECAlgorithm, OKPAlgorithm
+
+        self._maybe_reload()
+        keys = []
+        for kid, public_key in sorted(self._public.items()):
+            alg = _algorithm_for(public_key)
+            jwk_cls = OKPAlgorithm if alg == "EdDSA" else ECAlgorithm
+            jwk = jwk_cls.to_jwk(public_key, as_dict=True)
+            jwk.update({"kid": kid, "alg": alg, "use": "sig"})
+            keys.append(jwk)
+        return {"keys": keys}
+
+
+keyring = KeyRing(config.JWT_KEYS_DIR, config.JWT_ACTIVE_KID)
+
+
+def generate_key(directory: str, alg: str) -> str:
+    """Write a new private key named after the current time and return its kid."""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+    if alg == "EdDSA":
+        key = ed25519.Ed25519PrivateKey.generate()
+    elif alg == "ES256":
+        key = ec.generate_private_key(ec.SECP256R1())
+    else:
+        raise KeyRingError(f"Unsupported algorithm: {alg}")
+
+    os.makedirs(directory, exist_ok=True)
+    kid = f"{time.strftime('%Y%m%d%H%M%S')}-{alg.lower()}-{secrets.token_hex(2)}"
+    path = os.path.join(directory, f"{kid}.pem")
+    pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(pem)
+    return kid
+
+
+def run(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--alg", choices=["EdDSA", "ES256"], default="EdDSA")
+    parser.add_argument("--dir", default=config.JWT_KEYS_DIR)
+    args = parser.parse_args(argv)
+
+    kid = generate_key(args.dir, args.alg)
+    print(f"Generated {args.alg} key {kid} in {args.dir}")
+    print(json.dumps(KeyRing(args.dir).jwks(), indent=2))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,163 @@
+import random, threading, time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from src.core.config import config
+
+
+PREFIX = config.APP_NAME.replace("-", "_")
+DEFAULT_BUCKETS_S = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Phase -> [seconds, count] for the current request; None when the request is not sampled,
+# which turns every timer below into a single ContextVar lookup
+_request_timings: ContextVar[Optional[dict]] = ContextVar("request_timings", default=None)
+
+
+class MetricsRegistry:
+    """Minimal Prometheus-style counters and histograms rendered in the text exposition format."""
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS_S):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._help: dict[str, tuple[str, str, tuple]] = {}
+        self._counters: dict[str, dict[tuple, float]] = {}
+        self._histograms: dict[str, dict[tuple, list]] = {}
+
+    def describe(self, name: str, kind: str, help_text: str, labels: tuple = ()) -> None:
+        self._help[name] = (kind, help_text, labels)
+        (self._counters if kind == "counter" else self._histograms).setdefault(name, {})
+
+    def inc(self, name: str, labels: tuple = (), value: float = 1) -> None:
+        with self._lock:
+            series = self._counters[name]
+            series[labels] = series.get(labels, 0) + value
+
+    def observe(self, name: str, labels: tuple, seconds: float) -> None:
+        with self._lock:
+            series = self._histograms[name]
+            entry = series.get(labels)
+            if entry is None:
+                entry = series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += seconds
+            entry[2] += 1
+
+    @staticmethod
+    def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+        pairs = [f'{n}="{v}"' for n, v in zip(names, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> list[str]:
+        lines = []
+        with self._lock:
+            for name, (kind, help_text, label_names) in self._help.items():
+                full = f"{PREFIX}_{name}"
+                lines += [f"# HELP {full} {help_text}", f"# TYPE {full} {kind}"]
+                if kind == "counter":
+                    for values, total in self._counters[name].items():
+                        lines.append(f"{full}{self._labels(label_names, values)} {total}")
+                    continue
+                for values, (counts, total, count) in self._histograms[name].items():
+                    cumulative = 0
+                    for bound, bucket_count in zip(self.buckets, counts):
+                        cumulative += bucket_count
+                        le = self._labels(label_names, values, f'le="{bound}"')
+                        lines.append(f"{full}_bucket{le} {cumulative}")
+                    le = self._labels(label_names, values, 'le="+Inf"')
+                    lines.append(f"{full}_bucket{le} {count}")
+                    lines.append(f"{full}_sum{self._labels(label_names, values)} {total}")
+                    lines.append(f"{full}_count{self._labels(label_names, values)} {count}")
+        return lines
+
+
+def render_gauges(name: str, stats: dict) -> list[str]:
+    """Numeric fields of a stats() dict as `<prefix>_<name>_<field>` gauges."""
+    lines = []
+    for key, value in stats.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        full = f"{PREFIX}_{name}_{key}"
+        lines += [f"# TYPE {full} gauge", f"{full} {value}"]
+    return lines
+
+
+metrics = MetricsRegistry()
+metrics.describe("requests_total", "counter", "HTTP requests handled.", ("endpoint", "status"))
+metrics.describe("request_duration_seconds", "histogram", "Sampled HTTP request latency.", ("endpoint",))
+metrics.describe("phase_duration_seconds", "histogram", "Sampled time per phase: db, argon2, jwt.", ("phase",))
+metrics.describe("db_statements_total", "counter", "SQL statements executed by sampled requests.")
+
+
+def start_request():
+    """Begin collecting timings for this request if it is sampled. Returns a token for finish_request()."""
+    if not config.METRICS_ENABLED or random.random() >= config.METRICS_SAMPLE_RATE:
+        return None
+    return _request_timings.set({})
+
+
+def finish_request(token) -> Optional[dict]:
+    """Stop collecting and return {phase: [seconds, count]}, or None if the request was not sampled."""
+    if token is None:
+        return None
+    timings = _request_timings.get()
+    _request_timings.reset(token)
+    return timings
+
+
+def record(phase: str, seconds: float) -> None:
+    timings = _request_timings.get()
+    if timings is None:
+        return
+    entry = timings.setdefault(phase, [0.0, 0])
+    entry[0] += seconds
+    entry[1] += 1
+    metrics.observe("phase_duration_seconds", (phase,), seconds)
+
+
+@contextmanager
+def timed(phase: str):
+    if _request_timings.get() is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(phase, time.perf_counter() - start)
+
+
+def instrument_engines() -> None:
+    """Time every SQL statement of sampled requests, on every engine (sync and async)."""
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _request_timings.get() is not None:
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    starts = conn.info.get("metrics_query_start")
+    if starts:
+        record("db", time.perf_counter() - starts.pop())
+        metrics.inc("db_statements_total")
+
+
+def server_timing_header(timings: dict, total_s: float) -> str:
+    parts = [
+        f'{phase};dur={seconds * 1000:.2f};desc="{count}x"'
+        for phase, (seconds, count) in timings.items()
+    ]
+    parts.append(f"total;dur={total_s * 1000:.2f}")
+    return ", ".join(parts)
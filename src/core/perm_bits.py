@@ -0,0 +1,43 @@
+import base64
+from typing import Iterable, Mapping
+
+
+def encode_permission_bits(codes: Iterable[str], bit_index: Mapping[str, int]) -> str:
+    """Pack permission codes into an unpadded base64url little-endian bitmask."""
+    mask = 0
+    for code in codes:
+        mask |= 1 << bit_index[code]
+    raw = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_permission_bits(value: str) -> int:
+    """Inverse of encode_permission_bits."""
+    raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+    return int.from_bytes(raw, "little")
+
+
+class PermissionBits:
+    """O(1) permission checks against the `pbits` claim of an access token.
+
+    `bit_index` is the code -> bit map published by the permission registry; any
+    registry at least as new as the token's `pver` claim decodes it correctly.
+    """
+
+    def __init__(self, mask: int, bit_index: Mapping[str, int]):
+        self.mask = mask
+        self.bit_index = bit_index
+
+    @classmethod
+    def from_claims(cls, claims: Mapping, bit_index: Mapping[str, int]) -> "PermissionBits":
+        return cls(decode_permission_bits(claims.get("pbits", "")), bit_index)
+
+    def has(self, code: str) -> bool:
+        bit = self.bit_index.get(code)
+        return bit is not None and bool((self.mask >> bit) & 1)
+
+    def has_all(self, codes: Iterable[str]) -> bool:
+        return all(self.has(code) for code in codes)
+
+    def codes(self) -> list[str]:
+        return sorted(code for code, bit in self.bit_index.items() if (self.mask >> bit) & 1)
@@ -0,0 +1,151 @@
+import hashlib, os, threading, time
+from collections import OrderedDict
+from src.core.config import config
+
+
+class RateLimited(Exception):
+    """Raised when a caller has used up its attempts; retry after `retry_after` seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Rate limit exceeded")
+        self.retry_after = retry_after
+
+
+def parse_rate(spec: str) -> tuple[int, float]:
+    """Parse "10/60" into (10 attempts, 60 seconds)."""
+    limit, _, period = spec.partition("/")
+    return int(limit), float(period or 60)
+
+
+class MemoryBucketStore:
+    """Token buckets in a bounded LRU, keyed by an 8-byte digest of the limiter key.
+
+    Each entry is (tokens, last_update); at most `max_keys` are kept, so memory and
+    lookup cost stay flat however many distinct keys callers send. An evicted key
+    simply starts again with a full bucket.
+    """
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[bytes, tuple[float, float]]" = OrderedDict()
+        self.evictions = 0
+
+    def take(self, key: str, capacity: int, rate: float) -> float:
+        """Take one token; returns 0 if allowed, else the seconds until one is available."""
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._buckets.pop(digest, None)
+            tokens = capacity if entry is None else min(capacity, entry[0] + (now - entry[1]) * rate)
+            retry_after = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                retry_after = (1 - tokens) / rate
+            self._buckets[digest] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+                self.evictions += 1
+        return retry_after
+
+    def reset_after_fork(self) -> None:
+        self._lock = threading.Lock()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"backend": "memory", "keys": len(self._buckets), "max_keys": self.max_keys, "evictions": self.evictions}
+
+
+# Same algorithm as MemoryBucketStore, run atomically server-side with the server's clock
+_TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 't', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * rate)
+local retry = 0
+if tokens >= 1 then tokens = tokens - 1 else retry = (1 - tokens) / rate end
+redis.call('HSET', KEYS[1], 't', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return tostring(retry)
+"""
+
+
+class RedisBucketStore:
+    """Token buckets shared by every worker through a Redis-compatible server.
+
+    Keys expire once their bucket would be full again, so the server holds only
+    recently active keys. If the server is unreachable, attempts are allowed
+    (fail open) and counted in `errors`.
+    """
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        self.url = url
+        self.prefix = prefix
+        self._client = None
+        self._script = None
+        self.errors = 0
+
+    def _get_script(self):
+        if self._script is None:
+            try:
+                import redis  # optional dependency, only needed for a shared backend
+            except ImportError as exc:
+                raise RuntimeError("RATE_LIMIT_REDIS_URL is set but the 'redis' package is not installed") from exc
+            self._client = redis.Redis.from_url(self.url)
+            self._script = self._client.register_script(_TAKE_SCRIPT)
+        return self._script
+
+    def take(self, key: str, capacity: int, rate: float) -> float:
+        script = self._get_script()
+        try:
+            return float(script(keys=[self.prefix + key], args=[capacity, rate]))
+        except Exception:  # redis.RedisError, without importing redis at module level
+            self.errors += 1
+            return 0.0
+
+    def stats(self) -> dict:
+        return {"backend": "redis", "errors": self.errors}
+
+
+class RateLimiter:
+    """`limit` attempts per `period_s` for each key, refilled continuously (token bucket)."""
+
+    def __init__(self, name: str, limit: int, period_s: float, store):
+        self.name = name
+        self.capacity = limit
+        self.rate = limit / period_s
+        self.store = store
+        self.limited = 0
+
+    def hit(self, key: str) -> float:
+        """Count one attempt for `key`; returns 0 if allowed, else seconds to wait."""
+        retry_after = self.store.take(f"{self.name}:{key}", self.capacity, self.rate)
+        if retry_after:
+            self.limited += 1
+        return retry_after
+
+
+def _make_store():
+    if config.RATE_LIMIT_REDIS_URL:
+        return RedisBucketStore(config.RATE_LIMIT_REDIS_URL)
+    return MemoryBucketStore(config.RATE_LIMIT_MAX_KEYS)
+
+
+rate_limit_store = _make_store()
+if isinstance(rate_limit_store, MemoryBucketStore):
+    os.register_at_fork(after_in_child=rate_limit_store.reset_after_fork)
+login_identifier_limiter = RateLimiter("login-id", *parse_rate(config.RATE_LIMIT_LOGIN_IDENTIFIER), rate_limit_store)
+login_ip_limiter = RateLimiter("login-ip", *parse_rate(config.RATE_LIMIT_LOGIN_IP), rate_limit_store)
+
+
+def rate_limit_stats() -> dict:
+    return {
+        **rate_limit_store.stats(),
+        "limited_by_identifier": login_identifier_limiter.limited,
+        "limited_by_ip": login_ip_limiter.limited,
+    }
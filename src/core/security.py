@@ -1,18 +1,112 @@
-from passlib.context import CryptContext
+import asyncio, json, os, threading
+from typing import Optional
+from src.core.config import config
+from src.core.hash_pool import hash_pool
+from src.core.metrics import timed
 
+# passlib/argon2 are imported on first hash or verify, not at app startup
 
-pwd_ctx = CryptContext(schemes=["argon2"], deprecated="auto")
 
+def load_hash_policy(path: str = config.HASH_POLICY_FILE) -> dict:
+    """Load the argon2 cost policy: {"default": {...}, "providers": {"room": {...}}}."""
+    if not path or not os.path.exists(path):
+        return {"default": {}, "providers": {}}
+    with open(path) as fh:
+        policy = json.load(fh)
+    policy.setdefault("default", {})
+    policy.setdefault("providers", {})
+    return policy
 
-def hash_password(plaintext: str) -> str:
-    """Hash a plaintext password using bcrypt."""
+
+ARGON2_PARAMS = ("time_cost", "memory_cost", "parallelism")
+
+
+def _build_context(params: dict):
+    from passlib.context import CryptContext
+
+    # Policy entries also carry calibration notes (measured_ms, ...), which passlib must not see
+    settings = {f"argon2__{key}": params[key] for key in ARGON2_PARAMS if key in params}
+    return CryptContext(schemes=["argon2"], deprecated="auto", **settings)
+
+
+_contexts_lock = threading.Lock()
+_default_ctx = None
+# Providers without their own policy share the default context
+_provider_ctx: dict = {}
+
+
+def _load_contexts() -> None:
+    global _default_ctx, _provider_ctx
+    with _contexts_lock:
+        if _default_ctx is not None:
+            return
+        policy = load_hash_policy()
+        _provider_ctx = {
+            provider: _build_context({**policy["default"], **params})
+            for provider, params in policy["providers"].items()
+        }
+        _default_ctx = _build_context(policy["default"])
+
+
+def __getattr__(name):
+    # Backwards compatible `security.pwd_ctx`, built lazily
+    if name == "pwd_ctx":
+        return get_context()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _provider_key(provider) -> Optional[str]:
+    # Plain strings keep the arguments picklable for a process pool
+    return getattr(provider, "value", provider)
+
+
+def get_context(provider=None):
+    """Return the CryptContext for a provider (ProviderEnum or its value)."""
+    if _default_ctx is None:
+        _load_contexts()
+    if provider is None:
+        return _default_ctx
+    return _provider_ctx.get(_provider_key(provider), _default_ctx)
+
+
+def _hash(plaintext: str, provider: Optional[str]) -> str:
+    return get_context(provider).hash(plaintext)
+
+
+def _verify(plaintext: str, hashed: str, provider: Optional[str]) -> bool:
+    return get_context(provider).verify(plaintext, hashed)
+
+
+def _verify_and_update(plaintext: str, hashed: str, provider: Optional[str]) -> tuple[bool, Optional[str]]:
+    return get_context(provider).verify_and_update(plaintext, hashed)
+
+
+def hash_password(plaintext: str, provider=None) -> str:
+    """Hash a plaintext password using argon2 on the hashing pool."""
+    if isinstance(plaintext, (bytes, bytearray)):
+        plaintext = plaintext.decode("utf-8")
+    return hash_pool.run(_hash, plaintext, _provider_key(provider))
+
+
+@timed("argon2")
+def verify_password(plaintext: str, hashed: str, provider=None) -> bool:
+    """Verify a plaintext password against a hashed password on the hashing pool."""
+    if isinstance(plaintext, (bytes, bytearray)):
+        plaintext = plaintext.decode("utf-8")
+    return hash_pool.run(_verify, plaintext, hashed, _provider_key(provider))
+
+
+@timed("argon2")
+def verify_and_update_password(plaintext: str, hashed: str, provider=None) -> tuple[bool, Optional[str]]:
+    """Verify a password and, if its hash is outdated for the current policy, return a fresh hash."""
     if isinstance(plaintext, (bytes, bytearray)):
         plaintext = plaintext.decode("utf-8")
-    return pwd_ctx.hash(plaintext)
+    return hash_pool.run(_verify_and_update, plaintext, hashed, _provider_key(provider))
 
 
-def verify_password(plaintext: str, hashed: str) -> bool:
-    """Verify a plaintext password against a hashed password."""
+async def verify_and_update_password_async(plaintext: str, hashed: str, provider=None) -> tuple[bool, Optional[str]]:
+    """verify_and_update_password for event loops: awaits the hashing pool instead of blocking."""
     if isinstance(plaintext, (bytes, bytearray)):
         plaintext = plaintext.decode("utf-8")
-    return pwd_ctx.verify(plaintext, hashed)
+    with timed("argon2"):
+        return await asyncio.wrap_future(hash_pool.submit(_verify_and_update, plaintext, hashed, _provider_key(provider)))
@@ -0,0 +1,46 @@
+import os, threading
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from src.core.config import config
+from src.db.base import engine_options
+
+# Async counterpart of src/db/base.py for the ASGI entry point (asgi.py).
+# DATABASE_URL must name an async-capable driver; postgresql+psycopg is.
+
+_async_engine = None
+_async_engine_lock = threading.Lock()
+
+
+def get_async_engine():
+    """The process-wide AsyncEngine, created on first use."""
+    global _async_engine
+    if _async_engine is None:
+        with _async_engine_lock:
+            if _async_engine is None:
+                options = engine_options(config.DATABASE_URL)
+                # TimedQueuePool is sync-only; async engines need AsyncAdaptedQueuePool (the default)
+                options.pop("poolclass", None)
+                _async_engine = create_async_engine(config.DATABASE_URL, **options)
+    return _async_engine
+
+
+def _dispose_after_fork() -> None:
+    if _async_engine is not None:
+        _async_engine.sync_engine.dispose(close=False)
+
+
+os.register_at_fork(after_in_child=_dispose_after_fork)
+
+
+class AsyncLazyBindSession(Session):
+    """Sync half of an AsyncSession; binds to the async engine only when a statement runs."""
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        return get_async_engine().sync_engine
+
+
+AsyncSessionLocal = async_sessionmaker(
+    sync_session_class=AsyncLazyBindSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
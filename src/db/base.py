@@ -1,13 +1,291 @@
-from sqlalchemy.orm import DeclarativeBase, sessionmaker, scoped_session
-from sqlalchemy import create_engine
+import itertools, os, threading, time
+from contextlib import contextmanager
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker, scoped_session
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
 from src.core.config import config
 
 class Base(DeclarativeBase):
     pass
 
 
-engine = create_engine(config.DATABASE_URL, future=True)
-SessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long callers wait to check out a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.wait_total_s = 0.0
+        self.wait_max_s = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._stats_lock:
+                self.checkout_timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_total_s += waited
+                self.wait_max_s = max(self.wait_max_s, waited)
+
+    def recreate(self):
+        # Keep counters across dispose()/recreate
+        new_pool = super().recreate()
+        new_pool.checkouts, new_pool.checkout_timeouts = self.checkouts, self.checkout_timeouts
+        new_pool.wait_total_s, new_pool.wait_max_s = self.wait_total_s, self.wait_max_s
+        return new_pool
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "size": self.size(),
+                "checked_out": self.checkedout(),
+                "overflow": self.overflow(),
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.checkout_timeouts,
+                "wait_avg_ms": (self.wait_total_s / self.checkouts * 1000) if self.checkouts else 0.0,
+                "wait_max_ms": self.wait_max_s * 1000,
+            }
+
+
+def engine_options(url: str) -> dict:
+    """create_engine() keyword arguments for `url` built from the DB_* settings."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # in-memory SQLite keeps its single-connection pool
+        return {"query_cache_size": config.DB_QUERY_CACHE_SIZE}
+
+    options = {
+        "query_cache_size": config.DB_QUERY_CACHE_SIZE,
+        "poolclass": TimedQueuePool,
+        "pool_size": config.DB_POOL_SIZE,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_timeout": config.DB_POOL_TIMEOUT_S,
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+        "pool_recycle": config.DB_POOL_RECYCLE_S,
+    }
+    connect_args = {}
+    if parsed.get_backend_name() == "postgresql" and config.DB_STATEMENT_TIMEOUT_MS > 0:
+        connect_args["options"] = f"-c statement_timeout={config.DB_STATEMENT_TIMEOUT_MS}"
+    if parsed.get_driver_name() == "psycopg":
+        threshold = config.DB_PREPARE_THRESHOLD.strip().lower()
+        connect_args["prepare_threshold"] = None if threshold in ("", "none") else int(threshold)
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """The process-wide engine, created on first use rather than at import."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_engine(config.DATABASE_URL, future=True, **engine_options(config.DATABASE_URL))
+    return _engine
+
+
+def __getattr__(name):
+    # Backwards compatible `base.engine`
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class ReplicaSet:
+    """Round-robin over read-replica engines, skipping any that recently failed to connect."""
+
+    def __init__(self, urls: list[str], eject_s: float):
+        self.urls = urls
+        self.eject_s = eject_s
+        self._lock = threading.Lock()
+        self._engines = None
+        self._ejected_until: dict[int, float] = {}
+        self._turn = itertools.count()
+        self.ejections = 0
+
+    def _create_engines(self) -> list:
+        engines = []
+        for url in self.urls:
+            engine = create_engine(url, future=True, **engine_options(url))
+            event.listen(engine, "handle_error", self._on_error)
+            engines.append(engine)
+        return engines
+
+    def engines(self) -> list:
+        if self._engines is None:
+            with self._lock:
+                if self._engines is None:
+                    self._engines = self._create_engines()
+        return self._engines
+
+    def _on_error(self, context) -> None:
+        # Connect failures (no connection yet) and dropped connections take the replica out of rotation
+        if context.connection is None or context.is_disconnect:
+            self.eject(context.engine)
+
+    def eject(self, engine) -> None:
+        with self._lock:
+            self._ejected_until[id(engine)] = time.monotonic() + self.eject_s
+            self.ejections += 1
+
+    def healthy(self, engine) -> bool:
+        return self._ejected_until.get(id(engine), 0) <= time.monotonic()
+
+    def next_engine(self):
+        """The next healthy replica, or None if there are none."""
+        engines = self.engines()
+        for _ in range(len(engines)):
+            engine = engines[next(self._turn) % len(engines)]
+            if self.healthy(engine):
+                return engine
+        return None
+
+    def dispose(self, close: bool = True) -> None:
+        if self._engines is not None:
+            for engine in self._engines:
+                engine.dispose(close=close)
+
+    def stats(self) -> list[dict]:
+        return [
+            {
+                "url": engine.url.render_as_string(hide_password=True),
+                "healthy": self.healthy(engine),
+                "pool": engine.pool.stats() if isinstance(engine.pool, TimedQueuePool) else {"status": engine.pool.status()},
+            }
+            for engine in (self._engines or [])
+        ]
+
+
+replica_set = ReplicaSet(config.DATABASE_REPLICA_URLS, config.REPLICA_EJECT_S)
+
+
+def _dispose_after_fork() -> None:
+    # A forked worker must not reuse sockets inherited from the parent's pool;
+    # close=False drops them without sending a disconnect on the parent's behalf
+    if _engine is not None:
+        _engine.dispose(close=False)
+    replica_set.dispose(close=False)
+    db_session.registry.clear()
+
+
+os.register_at_fork(after_in_child=_dispose_after_fork)
+
+
+class LazyBindSession(Session):
+    """Session that resolves its engine at execution time, so importing models never connects."""
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        return get_engine()
+
+
+_REPLICA_READS_KEY = "replica_reads"
+_WROTE_KEY = "wrote_replicated_data"
+# Written on the primary but never read back from a replica, so they do not open the read-your-writes window
+REPLICA_SAFE_WRITES = frozenset({"refresh_tokens", "revoked_access_tokens"})
+_last_write_at = float("-inf")
+
+
+class RoutingSession(LazyBindSession):
+    """Sends SELECTs issued inside replica_reads() to a replica; everything else to the primary.
+
+    Replica reads fall back to the primary once this session has written, and for
+    READ_YOUR_WRITES_S after any commit in this process that wrote replicated data.
+    """
+
+    _replica = None
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if (
+            self.info.get(_REPLICA_READS_KEY)
+            and replica_set.urls
+            and not self._flushing
+            and clause is not None
+            and clause.is_select
+            and getattr(clause, "_for_update_arg", None) is None
+            and not self.info.get(_WROTE_KEY)
+            and time.monotonic() - _last_write_at >= config.READ_YOUR_WRITES_S
+        ):
+            engine = replica_set.next_engine()
+            if engine is not None:
+                self._replica = engine
+                return engine
+        return super().get_bind(mapper, clause, **kwargs)
+
+    def _with_replica_failover(self, method, *args, **kwargs):
+        self._replica = None
+        try:
+            return method(*args, **kwargs)
+        except DBAPIError:
+            failed = self._replica
+            if failed is None or replica_set.healthy(failed):
+                raise
+            # The replica was ejected by this failure; rerun the read on the next replica or the primary
+            return method(*args, **kwargs)
+
+    def execute(self, *args, **kwargs):
+        return self._with_replica_failover(super().execute, *args, **kwargs)
+
+    def scalar(self, *args, **kwargs):
+        return self._with_replica_failover(super().scalar, *args, **kwargs)
+
+    def scalars(self, *args, **kwargs):
+        return self._with_replica_failover(super().scalars, *args, **kwargs)
+
+
+@contextmanager
+def replica_reads(db: Session):
+    """Allow the read-only statements run inside this block to be served by a read replica."""
+    previous = db.info.get(_REPLICA_READS_KEY)
+    db.info[_REPLICA_READS_KEY] = True
+    try:
+        yield db
+    finally:
+        db.info[_REPLICA_READS_KEY] = previous
+
+
+def _mark_write(session: Session, tables) -> None:
+    if any(table not in REPLICA_SAFE_WRITES for table in tables):
+        session.info[_WROTE_KEY] = True
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _track_flushed_writes(session, flush_context) -> None:
+    _mark_write(session, {type(obj).__tablename__ for obj in [*session.new, *session.dirty, *session.deleted]})
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _track_statement_writes(orm_execute_state) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _mark_write(orm_execute_state.session, {orm_execute_state.statement.table.name})
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _open_read_your_writes_window(session) -> None:
+    global _last_write_at
+    if session.info.pop(_WROTE_KEY, False):
+        _last_write_at = time.monotonic()
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _forget_writes(session) -> None:
+    session.info.pop(_WROTE_KEY, None)
+
+
+SessionLocal = sessionmaker(class_=RoutingSession, autoflush=False, expire_on_commit=False)
 db_session = scoped_session(SessionLocal)
 
 
@@ -16,4 +294,22 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def get_request_db() -> Session:
+    """Session for the current request; released by the teardown registered in init_app."""
+    return db_session()
+
+
+def init_app(app) -> None:
+    """Return each request's session (and its connection) to the pool when the app context ends."""
+
+    @app.teardown_appcontext
+    def remove_session(exc=None):
+        db_session.remove()
+
+
+def pool_stats() -> dict:
+    pool = get_engine().pool
+    return pool.stats() if isinstance(pool, TimedQueuePool) else {"status": pool.status()}
@@ -0,0 +1,197 @@
+from datetime import datetime, timezone
+from sqlalchemy import event, func, insert, inspect, select, update
+from sqlalchemy.orm import Session
+from .models import User, Role, Permission, RolesVersion
+
+
+ROLES_VERSION_ROW_ID = 1
+
+
+def bump_roles_version(db: Session) -> None:
+    """Increment the roles_version counter so every process drops its cached role permissions."""
+    result = db.execute(
+        update(RolesVersion)
+        .where(RolesVersion.id == ROLES_VERSION_ROW_ID)
+        .values(version=RolesVersion.version + 1)
+    )
+    if result.rowcount == 0:
+        # Counter row is seeded by the migration; create it for databases built with create_all()
+        db.execute(insert(RolesVersion).values(id=ROLES_VERSION_ROW_ID, version=1))
+
+
+def _changed_attrs(obj) -> set[str]:
+    return {attr.key for attr in inspect(obj).attrs if attr.history.has_changes()}
+
+
+def _affects_role_permissions(obj) -> bool:
+    if isinstance(obj, Permission):
+        return True
+    # Role.users only touches user_roles, which the role permission cache does not depend on
+    return isinstance(obj, Role) and bool(_changed_attrs(obj) - {"users"})
+
+
+@event.listens_for(Session, "before_flush")
+def _bump_roles_version_on_change(session: Session, flush_context, instances) -> None:
+    created_or_deleted = list(session.new) + list(session.deleted)
+    if any(isinstance(obj, (Role, Permission)) for obj in created_or_deleted) or any(
+        _affects_role_permissions(obj) for obj in session.dirty
+    ):
+        bump_roles_version(session)
+
+
+def allocate_permission_bits(db: Session, count: int) -> int:
+    """Reserve `count` consecutive permission bits and return the first one.
+
+    The UPDATE holds the counter row's lock until commit, so concurrent allocators
+    serialize on it and never see the same range.
+    """
+    next_bit = db.scalar(
+        update(RolesVersion)
+        .where(RolesVersion.id == ROLES_VERSION_ROW_ID)
+        .values(next_bit=RolesVersion.next_bit + count)
+        .returning(RolesVersion.next_bit)
+    )
+    if next_bit is None:
+        # Counter row is seeded by the migration; create it for databases built with create_all()
+        max_bit = db.scalar(select(func.max(Permission.bit_index)))
+        first = 0 if max_bit is None else max_bit + 1
+        db.execute(insert(RolesVersion).values(id=ROLES_VERSION_ROW_ID, version=0, next_bit=first + count))
+        return first
+    return next_bit - count
+
+
+@event.listens_for(Session, "before_flush")
+def _assign_permission_bits(session: Session, flush_context, instances) -> None:
+    new_perms = [obj for obj in session.new if isinstance(obj, Permission) and obj.bit_index is None]
+    if not new_perms:
+        return
+    # Append-only: bits of deleted permissions are never handed out again
+    first = allocate_permission_bits(session, len(new_perms))
+    for offset, perm in enumerate(new_perms):
+        perm.bit_index = first + offset
+
+
+_PENDING_KEY = "effective_permissions_pending"
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_effective_permission_changes(session: Session, flush_context, instances) -> None:
+    from src.services.effective_permissions import users_with_roles  # imports models; avoid a cycle
+    from src.services.role_hierarchy import inheriting_roles
+
+    # Objects are kept (not ids) because new rows only get their ids during the flush
+    pending = session.info.setdefault(
+        _PENDING_KEY,
+        {"users": set(), "roles": set(), "new_roles": set(), "user_ids": set(), "closure_role_ids": set()},
+    )
+    for obj in session.dirty:
+        changed = _changed_attrs(obj)
+        if isinstance(obj, User) and "roles" in changed:
+            pending["users"].add(obj)
+        elif isinstance(obj, Role):
+            if "permissions" in changed:
+                pending["roles"].add(obj)
+            if "users" in changed:
+                # Membership changed from the role side (role.users.append/remove)
+                history = inspect(obj).attrs.users.history
+                pending["users"].update(list(history.added) + list(history.deleted))
+        elif isinstance(obj, Permission) and "roles" in changed:
+            history = inspect(obj).attrs.roles.history
+            pending["roles"].update(list(history.added) + list(history.deleted))
+    for obj in session.new:
+        if isinstance(obj, User) and obj.roles:
+            pending["users"].add(obj)
+        elif isinstance(obj, Role):
+            pending["new_roles"].add(obj)
+            if obj.permissions:
+                pending["roles"].add(obj)
+            pending["users"].update(obj.users)
+    for obj in session.deleted:
+        # user_roles and closure rows vanish with the role, so find what depended on it first
+        if isinstance(obj, Role) and obj.id is not None:
+            pending["user_ids"].update(users_with_roles(session, [obj.id]))
+            pending["closure_role_ids"].update(inheriting_roles(session, [obj.id]) - {obj.id})
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_effective_permissions(session: Session, flush_context) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    from src.services.effective_permissions import refresh_users, users_with_roles  # imports models; avoid a cycle
+    from src.services.role_hierarchy import ensure_self_rows, recompute_closure
+
+    if pending["new_roles"]:
+        ensure_self_rows(session, [role.id for role in pending["new_roles"]])
+    if pending["closure_role_ids"]:
+        recompute_closure(session, pending["closure_role_ids"])
+
+    user_ids = set(pending["user_ids"])
+    user_ids.update(user.id for user in pending["users"] if user.id is not None)
+    user_ids.update(users_with_roles(session, [role.id for role in pending["roles"] if role.id is not None]))
+    if user_ids:
+        refresh_users(session, user_ids)
+
+
+_TOKEN_VERSION_USERS_KEY = "token_version_users"
+
+
+@event.listens_for(Session, "before_flush")
+def _bump_token_version_on_change(session: Session, flush_context, instances) -> None:
+    # Deactivation or a roles change makes every token already issued to the user stale
+    users = set()
+    for obj in session.dirty:
+        if isinstance(obj, User) and {"is_active", "roles"} & _changed_attrs(obj):
+            users.add(obj)
+        elif isinstance(obj, Role) and "users" in _changed_attrs(obj):
+            # Membership changed from the role side (role.users.append/remove)
+            history = inspect(obj).attrs.users.history
+            users.update(list(history.added) + list(history.deleted))
+    for obj in session.new:
+        if isinstance(obj, Role):
+            users.update(obj.users)
+
+    now = datetime.now(timezone.utc)
+    for user in users:
+        if user.id is None or user in session.deleted:
+            continue  # new users have no tokens yet
+        user.token_version = User.token_version + 1  # in SQL, so concurrent bumps both count
+        user.token_version_changed_at = now
+        session.info.setdefault(_TOKEN_VERSION_USERS_KEY, set()).add(user.id)
+
+    deleted_role_ids = [obj.id for obj in session.deleted if isinstance(obj, Role) and obj.id is not None]
+    if deleted_role_ids:
+        from src.services.effective_permissions import users_with_roles  # imports models; avoid a cycle
+        from src.services.token_versions import bump_token_versions
+
+        # user_roles rows vanish with the role, so its holders are bumped before the flush deletes them
+        bumped = session.info.get(_TOKEN_VERSION_USERS_KEY, set())
+        bump_token_versions(session, users_with_roles(session, deleted_role_ids) - bumped)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_token_versions(session: Session, flush_context) -> None:
+    user_ids = session.info.pop(_TOKEN_VERSION_USERS_KEY, None)
+    if not user_ids:
+        return
+    from src.services.token_versions import PENDING_KEY  # imports models; avoid a cycle
+
+    rows = session.execute(select(User.id, User.token_version).where(User.id.in_(user_ids))).all()
+    session.info.setdefault(PENDING_KEY, {}).update({user_id: version for user_id, version in rows})
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_token_versions(session: Session) -> None:
+    from src.services.token_versions import PENDING_KEY, token_version_map
+
+    pending = session.info.pop(PENDING_KEY, None)
+    if pending:
+        token_version_map.apply(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_token_versions(session: Session) -> None:
+    from src.services.token_versions import PENDING_KEY
+
+    session.info.pop(PENDING_KEY, None)
+    session.info.pop(_TOKEN_VERSION_USERS_KEY, None)
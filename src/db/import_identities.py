@@ -0,0 +1,46 @@
+"""Bulk-import users and login identities from CSV or JSONL.
+
+Columns/keys: provider, identifier, password, full_name, email, roles
+(roles separated by "," or ";"). Re-running is safe: identities are upserted
+on (provider, identifier_normalized) and role links are idempotent.
+
+Usage:
+    python -m src.db.import_identities residents.csv --batch-size 500 --workers 8
+"""
+import argparse, os
+from src.db.base import SessionLocal
+from src.services.bulk_import import import_identities
+
+
+def run(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=None, help="hashing processes (default: all cores)")
+    parser.add_argument("--checkpoint", default=None, help="checkpoint file (default: <path>.checkpoint)")
+    parser.add_argument("--restart", action="store_true", help="ignore any existing checkpoint")
+    args = parser.parse_args(argv)
+
+    checkpoint = args.checkpoint or f"{args.path}.checkpoint"
+    if args.restart and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+
+    totals = import_identities(
+        SessionLocal,
+        args.path,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        checkpoint_path=checkpoint,
+    )
+    print(
+        f"Imported {totals['records']} record(s): {totals['users_created']} new user(s), "
+        f"{totals['identities_upserted']} identit(y/ies) upserted, {totals['role_links']} role link(s), "
+        f"{totals['invalid']} invalid, "
+        f"{totals['skipped']} skipped (duplicate email)"
+    )
+    if totals["missing_roles"]:
+        print(f"Unknown roles skipped: {', '.join(totals['missing_roles'])}")
+
+
+if __name__ == "__main__":
+    run()
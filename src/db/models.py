@@ -1,6 +1,7 @@
-from sqlalchemy import String, Integer, Boolean, Table, Column, ForeignKey, Index, Enum, UniqueConstraint
+from sqlalchemy import DDL, event, String, Integer, Boolean, DateTime, Table, Column, ForeignKey, Index, Enum, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import Optional
+from datetime import datetime
 import enum
 from .base import Base
 
@@ -22,6 +23,35 @@ role_permissions = Table(
 )
 
 
+# Direct inheritance edges: `role_id` inherits every permission of `inherited_role_id`
+role_inheritance = Table(
+    "role_inheritance",
+    Base.metadata,
+    Column("role_id", ForeignKey("roles.id", ondelete="CASCADE"), primary_key=True),
+    Column("inherited_role_id", ForeignKey("roles.id", ondelete="CASCADE"), primary_key=True, index=True),
+)
+
+
+# Transitive closure of role_inheritance, including a (role, role) row for every role.
+# Maintained by src/services/role_hierarchy.py
+role_closure = Table(
+    "role_closure",
+    Base.metadata,
+    Column("role_id", ForeignKey("roles.id", ondelete="CASCADE"), primary_key=True),
+    Column("implied_role_id", ForeignKey("roles.id", ondelete="CASCADE"), primary_key=True, index=True),
+)
+
+
+# Denormalized user -> permission rows derived from user_roles x role_closure x role_permissions.
+# Maintained by src/services/effective_permissions.py; repair with src/db/rebuild_effective_permissions.py
+user_effective_permissions = Table(
+    "user_effective_permissions",
+    Base.metadata,
+    Column("user_id", ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    Column("permission_id", ForeignKey("permissions.id", ondelete="CASCADE"), primary_key=True),
+)
+
+
 # -- MODELS --
 class User(Base):
     __tablename__ = "users"
@@ -30,6 +60,10 @@ class User(Base):
     full_name: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     email: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)  # NOT unique here
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    last_login_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)  # written by src/services/login_audit.py
+    # Embedded in access tokens as "tv"; bumped to invalidate them, see src/services/token_versions.py
+    token_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    token_version_changed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True, index=True)
 
     identities: Mapped[list["AuthIdentity"]] = relationship(
         "AuthIdentity",
@@ -44,14 +78,18 @@ class User(Base):
     )
 
 
-# Partial unique index on email WHEN email is not null
-Index(
-    "uq_users_email_not_null",
-    User.email,
-    unique=True,
-    postgresql_where=User.email.isnot(None)
+# Partial unique index on email WHEN email is not null. Emitted as DDL rather than declared
+# with Index(postgresql_where=...), which imports the whole Postgres dialect at startup;
+# SQLite accepts the same statement. Migrations own it in deployed databases (see alembic/env.py)
+event.listen(
+    User.__table__,
+    "after_create",
+    DDL("CREATE UNIQUE INDEX uq_users_email_not_null ON users (email) WHERE email IS NOT NULL"),
 )
 
+# Keyset pages filtered by is_active walk this index in id order
+Index("ix_users_is_active_id", User.is_active, User.id)
+
 
 # Provider Enum denoting type of login
 class ProviderEnum(str, enum.Enum):
@@ -79,6 +117,8 @@ class AuthIdentity(Base):
     __table_args__ = (
         # One active identity per provider per identifier_normalized
         UniqueConstraint("provider", "identifier_normalized", name="uq_identity_provider_identifier"),
+        # "users with a <provider> identity" filter on the admin listing
+        Index("ix_auth_identities_provider_user_id", "provider", "user_id"),
     )
 
 
@@ -108,6 +148,7 @@ class Permission(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     code: Mapped[str] = mapped_column(String(128), unique=True, index=True)  # e.g. "user:read", "user:assign-role"
+    bit_index: Mapped[int] = mapped_column(Integer, unique=True)  # stable bit in compact token claims; never reused
     description: Mapped[Optional[str]]
 
     roles: Mapped[list[Role]] = relationship(
@@ -115,4 +156,56 @@ class Permission(Base):
         secondary=role_permissions,
         back_populates="permissions",
         passive_deletes=True
-    )
\ No newline at end of file
+    )
+
+
+class RolesVersion(Base):
+    """Single-row counter bumped whenever roles, permissions or role_permissions change.
+
+    Also holds the permission bit allocator: next_bit only ever grows, so bits of
+    deleted permissions are never handed out again.
+    """
+    __tablename__ = "roles_version"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, default=0)
+    next_bit: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+
+
+class RefreshToken(Base):
+    """Opaque, single-use refresh token. Only the SHA-256 of the token is stored."""
+    __tablename__ = "refresh_tokens"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True)
+    family_id: Mapped[str] = mapped_column(String(32), index=True)  # shared by every rotation of one login
+    token_hash: Mapped[str] = mapped_column(String(64), unique=True, index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    revoked_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    replaced_by_id: Mapped[Optional[int]] = mapped_column(ForeignKey("refresh_tokens.id", ondelete="SET NULL"), nullable=True)
+
+
+class RevokedAccessToken(Base):
+    """Access-token denylist; rows are mirrored in memory by src/services/revocation.py."""
+    __tablename__ = "revoked_access_tokens"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)  # also the sync cursor
+    jti: Mapped[str] = mapped_column(String(32), unique=True)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+
+
+class LoginEvent(Base):
+    """One login attempt. Rows are written in batches by src/services/login_audit.py."""
+    __tablename__ = "login_events"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)  # None if no identity matched
+    provider: Mapped[Optional[ProviderEnum]] = mapped_column(Enum(ProviderEnum), nullable=True)
+    succeeded: Mapped[bool] = mapped_column(Boolean)
+    client_ip: Mapped[Optional[str]] = mapped_column(String(45), nullable=True)  # fits IPv6
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+
+
+# Register ORM listeners that keep the version counters above up to date
+from . import events  # noqa: E402,F401
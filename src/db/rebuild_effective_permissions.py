@@ -0,0 +1,32 @@
+import argparse, sys
+from src.db.base import SessionLocal
+from src.services.effective_permissions import find_drift, rebuild_all
+from src.services.role_hierarchy import find_closure_drift, rebuild_closure
+
+
+def run(argv=None):
+    parser = argparse.ArgumentParser(description="Check or rebuild role_closure and user_effective_permissions.")
+    parser.add_argument("--check", action="store_true", help="only report drift; exit 1 if any is found")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        closure_missing, closure_extra = find_closure_drift(db)
+        print(f"role_closure: {closure_missing} missing row(s), {closure_extra} stale row(s)")
+        missing, extra = find_drift(db)
+        print(f"user_effective_permissions: {missing} missing row(s), {extra} stale row(s)")
+        if args.check:
+            return 1 if (closure_missing or closure_extra or missing or extra) else 0
+
+        # The closure feeds the effective permissions, so it is always rebuilt first
+        rebuild_closure(db)
+        rebuild_all(db)
+        db.commit()
+        print("Rebuild completed.")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -57,7 +57,7 @@ def upsert_user_with_identity(
         if email_for_profile and user.email != email_for_profile:
             user.email = email_for_profile
         if password_plaintext:
-            identity.password_hash = hash_password(password_plaintext)
+            identity.password_hash = hash_password(password_plaintext, provider)
         db.flush()
         return user
 
@@ -75,7 +75,7 @@ def upsert_user_with_identity(
         provider=provider,
         identifier=identifier,
         identifier_normalized=identifier_norm,
-        password_hash=hash_password(password_plaintext),
+        password_hash=hash_password(password_plaintext, provider),
         is_active=True,
         is_primary=is_primary,
         user=user
@@ -0,0 +1,37 @@
+import threading, time
+from datetime import datetime, timezone
+from typing import Callable
+from sqlalchemy.orm import Session
+
+
+def as_utc(value: datetime) -> datetime:
+    """Timestamps read back from SQLite lose their timezone; they were written in UTC."""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+class TableMirror:
+    """Base for in-memory mirrors of a table, pulled by sync() at most every `sync_interval` seconds.
+
+    Subclasses implement sync(db) under self._lock and call _synced() when done.
+    """
+
+    def __init__(self, sync_interval: float = 5.0):
+        self.sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self._last_sync = 0.0
+
+    def sync(self, db: Session) -> None:
+        raise NotImplementedError
+
+    def _synced(self) -> None:
+        self._last_sync = time.time()
+
+    def maybe_sync(self, session_factory: Callable[[], Session]) -> None:
+        """Sync if the last one is older than sync_interval; cheap enough to call per request."""
+        if time.time() - self._last_sync < self.sync_interval:
+            return
+        db = session_factory()
+        try:
+            self.sync(db)
+        finally:
+            db.close()
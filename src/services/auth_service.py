@@ -1,10 +1,60 @@
+import math
+from functools import lru_cache
 from typing import Optional, List
-from sqlalchemy import select
-from sqlalchemy.orm import Session
-from src.db.models import User, AuthIdentity, ProviderEnum
-from src.core.security import verify_password
+from sqlalchemy import bindparam, select, case, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+from src.db.base import replica_reads
+from src.db.models import User, AuthIdentity, ProviderEnum, RolesVersion, user_roles
+from src.db.events import ROLES_VERSION_ROW_ID
+from src.core.security import verify_and_update_password, verify_and_update_password_async
 from src.core.jwt_tools import issue_access_token
+from src.core.perm_bits import encode_permission_bits
+from src.core.rate_limit import RateLimited, login_identifier_limiter, login_ip_limiter
+from src.core.config import config
 from ._normalize import normalize_identifier
+from .permission_cache import role_permission_cache
+from .permission_registry import permission_registry
+from .login_audit import login_audit
+from .refresh_tokens import issue_refresh_token, rotate_refresh_token
+
+
+# Hot-path statements are built once and only their bound values change per login, so each
+# execution skips statement construction and hits the engine's compiled cache
+# (DB_QUERY_CACHE_SIZE) and, on psycopg, the server-side prepared statement (DB_PREPARE_THRESHOLD)
+@lru_cache(maxsize=None)
+def _identity_lookup_stmt(providers: tuple[ProviderEnum, ...]):
+    """Best active identity among `providers`, taking `ident_<i>` as the normalized identifier for providers[i]."""
+    priority = case(
+        {prov: idx for idx, prov in enumerate(providers)},
+        value=AuthIdentity.provider,
+    )
+    return (
+        select(AuthIdentity)
+        .where(
+            or_(*(
+                and_(
+                    AuthIdentity.provider == prov,
+                    AuthIdentity.identifier_normalized == bindparam(f"ident_{idx}"),
+                )
+                for idx, prov in enumerate(providers)
+            )),
+            AuthIdentity.is_active == True,  # noqa: E712
+        )
+        .options(joinedload(AuthIdentity.user))  # user comes back in the same round trip
+        .order_by(priority, AuthIdentity.is_primary.desc())  # provider order first, then prefer primary
+        .limit(1)
+    )
+
+
+_USER_ROLES_STMT = (
+    select(
+        user_roles.c.role_id,
+        select(RolesVersion.version).where(RolesVersion.id == ROLES_VERSION_ROW_ID).scalar_subquery(),
+    )
+    .where(user_roles.c.user_id == bindparam("user_id"))
+    .order_by(user_roles.c.role_id)
+)
 
 
 class AuthService:
@@ -21,66 +71,258 @@ class AuthService:
         s = raw_identifier.strip()
         if "@" in s:
             return [ProviderEnum.email]
-        # Could add more heuristics here
-        return self.DEFAULT_PROVIDER_ORDER
+        # Numeric usernames are allowed, so a number keeps the default username-then-room order
+        if s.isdigit():
+            return [ProviderEnum.username, ProviderEnum.room]
+        # Without an "@" the identifier can never match an email identity
+        return [p for p in self.DEFAULT_PROVIDER_ORDER if p != ProviderEnum.email]
+
+    def _find_identity(self, db: Session, identifier: str, providers: List[ProviderEnum]) -> Optional[AuthIdentity]:
+        """Resolve the best active identity across all candidate providers in one statement."""
+        params = {f"ident_{idx}": normalize_identifier(prov, identifier) for idx, prov in enumerate(providers)}
+        return db.scalar(_identity_lookup_stmt(tuple(providers)), params)
     
-    def login(
+    def _load_roles_and_permissions(self, db: Session, user_id: int) -> tuple[List[str], List[str], Optional[int]]:
+        """Resolve role names, permission codes and the roles_version they were read under."""
+        with replica_reads(db):
+            rows = db.execute(_USER_ROLES_STMT, {"user_id": user_id}).all()
+            if not rows:
+                return [], [], None
+
+            role_ids = [role_id for role_id, _ in rows]
+            roles_version = rows[0][1] or 0
+            entries = role_permission_cache.get_many(db, role_ids, roles_version)
+
+        roles = [entries[rid][0] for rid in role_ids if rid in entries]
+        permissions = sorted(set().union(*(entries[rid][1] for rid in role_ids if rid in entries)))
+        return roles, permissions, roles_version
+
+    def _throttle(self, identifier: str, provider: Optional[ProviderEnum], client_ip: Optional[str]) -> None:
+        """Raise RateLimited before any DB or Argon2 work if this IP or identifier is over its limit."""
+        if not config.RATE_LIMIT_ENABLED:
+            return
+        retry_after = login_ip_limiter.hit(client_ip) if client_ip else 0.0
+        if not retry_after and identifier:
+            # username/room/email all casefold, so one key covers every provider guess
+            retry_after = login_identifier_limiter.hit(normalize_identifier(provider or ProviderEnum.username, identifier))
+        if retry_after:
+            raise RateLimited(math.ceil(retry_after))
+
+    def _lookup_identity(
         self,
         db: Session,
-        *,
         identifier: str,
         password: str,
-        provider: Optional[ProviderEnum] = None,
-    ) -> Optional[str]:
-        """Attempt to log in a user and return an access token if successful."""
+        provider: Optional[ProviderEnum],
+    ) -> Optional[AuthIdentity]:
+        """First login phase: the identity whose password hash must be checked, or None."""
         if not identifier or not password:
             return None
         
         providers = [provider] if provider else self._auto_pick_provider(identifier)
 
-        # Try in order of providers until an active identity is found
-        found_identity: Optional[AuthIdentity] = None
-        for prov in providers:
-            ident_norm = normalize_identifier(prov, identifier)
-            stmt = (
-                select(AuthIdentity)
-                .where(
-                    AuthIdentity.provider == prov,
-                    AuthIdentity.identifier_normalized == ident_norm,
-                    AuthIdentity.is_active == True,  # noqa: E712
-                )
-                .order_by(AuthIdentity.is_primary.desc())
-                .limit(1)  # prefer primary identity if multiple
-            )
+        # All providers are probed at once; the first one in priority order wins
+        with replica_reads(db):
+            found_identity = self._find_identity(db, identifier, providers)
 
-            found_identity = db.scalar(stmt)
-            if found_identity:
-                break
-        
         # No active identity found
         if not found_identity or not found_identity.password_hash:
             return None
 
-        # Unable to verify password
-        if not verify_password(password, found_identity.password_hash):
-            return None
-        
-        user = found_identity.user
+        # End the read transaction so the pooled connection is not held while Argon2 runs
+        db.commit()
+        return found_identity
+
+    def _accept_identity(self, db: Session, identity: AuthIdentity, new_hash: Optional[str]) -> Optional[User]:
+        """Last login phase, after a successful password check: the active user, or None."""
+        user = identity.user
 
         # Inactive user
         if not user or not user.is_active:
             return None
-        
-        # Success - issue token
+
+        # Hash was made under an older cost policy - upgrade it now that we know the plaintext
+        if new_hash:
+            identity.password_hash = new_hash
+            db.commit()
+
+        return user
+
+    def _authenticate(
+        self,
+        db: Session,
+        identifier: str,
+        password: str,
+        provider: Optional[ProviderEnum],
+        client_ip: Optional[str] = None,
+    ) -> Optional[User]:
+        """Return the active user owning these credentials, or None. Raises RateLimited."""
+        self._throttle(identifier, provider, client_ip)
+        found_identity = self._lookup_identity(db, identifier, password, provider)
+        user = None
+        if found_identity:
+            verified, new_hash = verify_and_update_password(
+                password, found_identity.password_hash, found_identity.provider
+            )
+            if verified:
+                user = self._accept_identity(db, found_identity, new_hash)
+
+        self._audit(found_identity, provider, user is not None, client_ip)
+        return user
+
+    def _audit(
+        self,
+        identity: Optional[AuthIdentity],
+        provider: Optional[ProviderEnum],
+        succeeded: bool,
+        client_ip: Optional[str],
+    ) -> None:
+        # Queued for the background writer; never adds a write to the login itself
+        if config.LOGIN_AUDIT_ENABLED:
+            login_audit.record(
+                identity.user_id if identity else None,
+                identity.provider if identity else provider,
+                succeeded,
+                client_ip,
+            )
+
+    def _issue_access_token(self, db: Session, user: User) -> str:
         # Gather roles and permissions
-        roles = [role.name for role in user.roles if role]
-        permissions = sorted({perm.code for role in user.roles if role for perm in role.permissions if perm})
-        
-        jwt = issue_access_token(
+        roles, permissions, roles_version = self._load_roles_and_permissions(db, user.id)
+
+        perm_bits = perm_registry_version = None
+        if config.TOKEN_PERMS_FORMAT != "list":
+            bit_index, perm_registry_version = permission_registry.sync(db, roles_version)
+            if not bit_index.keys() >= set(permissions):
+                # A permission committed after this snapshot was read (or served by a lagging replica)
+                bit_index, perm_registry_version = permission_registry.sync_latest(db, force=True)
+            if bit_index.keys() >= set(permissions):
+                perm_bits = encode_permission_bits(permissions, bit_index)
+            else:
+                perm_registry_version = None  # the token falls back to the `perms` list claim
+
+        return issue_access_token(
             sub=str(user.id),
             email=user.email or "",
             roles=roles,
-            perms=permissions
+            perms=permissions,
+            perm_bits=perm_bits,
+            perm_registry_version=perm_registry_version,
+            token_version=user.token_version or 0,
         )
 
-        return jwt
\ No newline at end of file
+    def login(
+        self,
+        db: Session,
+        *,
+        identifier: str,
+        password: str,
+        provider: Optional[ProviderEnum] = None,
+        client_ip: Optional[str] = None,
+    ) -> Optional[str]:
+        """Attempt to log in a user and return an access token if successful."""
+        user = self._authenticate(db, identifier, password, provider, client_ip)
+        if not user:
+            return None
+        
+        # Success - issue token
+        return self._issue_access_token(db, user)
+
+    def login_with_refresh(
+        self,
+        db: Session,
+        *,
+        identifier: str,
+        password: str,
+        provider: Optional[ProviderEnum] = None,
+        client_ip: Optional[str] = None,
+    ) -> Optional[tuple[str, str]]:
+        """Like login(), but also start a refresh-token family. Returns (access, refresh)."""
+        user = self._authenticate(db, identifier, password, provider, client_ip)
+        if not user:
+            return None
+
+        access_token = self._issue_access_token(db, user)
+        refresh_token, _ = issue_refresh_token(db, user.id)
+        db.commit()
+        return access_token, refresh_token
+
+    def refresh(self, db: Session, refresh_token: str) -> Optional[tuple[str, str]]:
+        """Exchange a refresh token for a new (access, refresh) pair without touching Argon2."""
+        if not refresh_token:
+            return None
+
+        rotated = rotate_refresh_token(db, refresh_token)
+        if not rotated:
+            return None
+        new_refresh_token, row = rotated
+
+        user = db.get(User, row.user_id)
+        if not user or not user.is_active:
+            db.rollback()
+            return None
+
+        access_token = self._issue_access_token(db, user)
+        db.commit()
+        return access_token, new_refresh_token
+
+    async def _authenticate_async(
+        self,
+        db: AsyncSession,
+        identifier: str,
+        password: str,
+        provider: Optional[ProviderEnum],
+        client_ip: Optional[str] = None,
+    ) -> Optional[User]:
+        """Async _authenticate(): the DB phases run via run_sync, Argon2 is awaited off the loop."""
+        self._throttle(identifier, provider, client_ip)
+        found_identity = await db.run_sync(
+            lambda s: self._lookup_identity(s, identifier, password, provider)
+        )
+        user = None
+        if found_identity:
+            verified, new_hash = await verify_and_update_password_async(
+                password, found_identity.password_hash, found_identity.provider
+            )
+            if verified:
+                user = await db.run_sync(lambda s: self._accept_identity(s, found_identity, new_hash))
+
+        self._audit(found_identity, provider, user is not None, client_ip)
+        return user
+
+    async def login_async(
+        self,
+        db: AsyncSession,
+        *,
+        identifier: str,
+        password: str,
+        provider: Optional[ProviderEnum] = None,
+        client_ip: Optional[str] = None,
+    ) -> Optional[str]:
+        """Async variant of login()."""
+        user = await self._authenticate_async(db, identifier, password, provider, client_ip)
+        if not user:
+            return None
+        return await db.run_sync(lambda s: self._issue_access_token(s, user))
+
+    async def login_with_refresh_async(
+        self,
+        db: AsyncSession,
+        *,
+        identifier: str,
+        password: str,
+        provider: Optional[ProviderEnum] = None,
+        client_ip: Optional[str] = None,
+    ) -> Optional[tuple[str, str]]:
+        """Async variant of login_with_refresh(). Returns (access, refresh)."""
+        user = await self._authenticate_async(db, identifier, password, provider, client_ip)
+        if not user:
+            return None
+
+        def _issue(s: Session) -> tuple[str, str]:
+            access_token = self._issue_access_token(s, user)
+            refresh_token, _ = issue_refresh_token(s, user.id)
+            s.commit()
+            return access_token, refresh_token
+
+        return await db.run_sync(_issue)
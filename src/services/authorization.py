@@ -0,0 +1,30 @@
+from typing import Sequence
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+from src.db.base import replica_reads
+from src.db.models import Permission, User, user_effective_permissions
+
+
+MAX_PAIRS = 1000
+
+
+def authorize_pairs(db: Session, pairs: Sequence[tuple[int, str]]) -> list[bool]:
+    """Decide every (user_id, permission code) pair with one query against user_effective_permissions.
+
+    Decisions come back in input order; inactive or unknown users and unknown codes are denied.
+    """
+    unique = list(dict.fromkeys(pairs))
+    if not unique:
+        return []
+    stmt = (
+        select(user_effective_permissions.c.user_id, Permission.code)
+        .join(Permission, Permission.id == user_effective_permissions.c.permission_id)
+        .join(User, User.id == user_effective_permissions.c.user_id)
+        .where(
+            tuple_(user_effective_permissions.c.user_id, Permission.code).in_(unique),
+            User.is_active == True,  # noqa: E712
+        )
+    )
+    with replica_reads(db):
+        granted = set(db.execute(stmt).tuples())
+    return [pair in granted for pair in pairs]
@@ -0,0 +1,263 @@
+import csv, json, os
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, Optional
+from sqlalchemy import bindparam, insert, select, tuple_, update
+from sqlalchemy.orm import Session
+from src.db.models import User, AuthIdentity, ProviderEnum, Role, user_roles
+from src.core.security import _hash
+from src.services._normalize import normalize_identifier
+from src.services.effective_permissions import refresh_users
+from src.services.token_versions import bump_token_versions
+
+
+class ImportRecordError(ValueError):
+    """A source record that cannot be imported."""
+
+
+def read_records(path: str) -> Iterator[dict]:
+    """Stream records from a .csv (header row) or .jsonl file."""
+    with open(path, newline="", encoding="utf-8") as fh:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line in fh:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(fh)
+
+
+def prepare_record(raw: dict) -> dict:
+    """Validate and normalize one source record."""
+    try:
+        provider = ProviderEnum((raw.get("provider") or "").strip())
+    except ValueError:
+        raise ImportRecordError(f"unknown provider {raw.get('provider')!r}")
+    identifier = (raw.get("identifier") or "").strip()
+    password = raw.get("password") or ""
+    if not identifier or not password:
+        raise ImportRecordError("identifier and password are required")
+
+    roles = raw.get("roles") or []
+    if isinstance(roles, str):
+        roles = [name.strip() for name in roles.replace(";", ",").split(",")]
+
+    return {
+        "provider": provider,
+        "identifier": identifier,
+        "identifier_normalized": normalize_identifier(provider, identifier),
+        "password": password,
+        "full_name": (raw.get("full_name") or "").strip() or None,
+        "email": (raw.get("email") or "").strip() or None,
+        "roles": [name for name in roles if name],
+    }
+
+
+def _insert_for(db: Session, table):
+    # Both dialects expose the same on_conflict_* API
+    if db.get_bind().dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    return dialect_insert(table)
+
+
+def _duplicate_email_keys(db: Session, new_records: list[tuple[tuple, dict]]) -> set[tuple]:
+    """Keys of would-be new users whose email another user (or an earlier record) already has."""
+    emails = {rec["email"] for _, rec in new_records if rec["email"]}
+    taken = set(db.scalars(select(User.email).where(User.email.in_(emails)))) if emails else set()
+    duplicates = set()
+    for key, rec in new_records:
+        if not rec["email"]:
+            continue
+        if rec["email"] in taken:
+            duplicates.add(key)
+        else:
+            taken.add(rec["email"])
+    return duplicates
+
+
+def write_batch(db: Session, records: list[dict], hashes: list[str]) -> dict:
+    """Upsert one batch of users, identities and role links with a handful of set-based statements."""
+    keys = [(r["provider"], r["identifier_normalized"]) for r in records]
+    existing = {
+        (prov, ident): user_id
+        for prov, ident, user_id in db.execute(
+            select(AuthIdentity.provider, AuthIdentity.identifier_normalized, AuthIdentity.user_id)
+            .where(tuple_(AuthIdentity.provider, AuthIdentity.identifier_normalized).in_(keys))
+        )
+    }
+
+    # A key repeated within the batch resolves to one user; the last record wins, as for identities
+    latest = dict(zip(keys, records))
+    new_keys = [key for key in latest if key not in existing]
+    # users.email is unique when set; such records are skipped and reported rather than failing the batch
+    skipped = _duplicate_email_keys(db, [(key, latest[key]) for key in new_keys])
+    new_keys = [key for key in new_keys if key not in skipped]
+    if new_keys:
+        new_ids = db.scalars(
+            insert(User).returning(User.id, sort_by_parameter_order=True),
+            [
+                {"full_name": latest[key]["full_name"], "email": latest[key]["email"], "is_active": True}
+                for key in new_keys
+            ],
+        ).all()
+        existing.update(zip(new_keys, new_ids))
+
+    # Refresh profile fields of users that already existed
+    profile_updates = [
+        {"uid": existing[key], "full_name": rec["full_name"]}
+        for key, rec in latest.items()
+        if key not in new_keys and key not in skipped and rec["full_name"]
+    ]
+    if profile_updates:
+        db.connection().execute(
+            update(User.__table__).where(User.__table__.c.id == bindparam("uid")).values(full_name=bindparam("full_name")),
+            profile_updates,
+        )
+
+    identity_rows = {
+        key: {
+            "user_id": existing[key],
+            "provider": rec["provider"].name,
+            "identifier": rec["identifier"],
+            "identifier_normalized": rec["identifier_normalized"],
+            "password_hash": password_hash,
+            "is_active": True,
+            "is_primary": True,
+        }
+        for key, rec, password_hash in zip(keys, records, hashes)
+        if key not in skipped
+    }
+    stmt = _insert_for(db, AuthIdentity.__table__)
+    if identity_rows:
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["provider", "identifier_normalized"],
+                set_={"password_hash": stmt.excluded.password_hash, "identifier": stmt.excluded.identifier, "is_active": True},
+            ),
+            list(identity_rows.values()),
+        )
+
+    role_names = {name for rec in records for name in rec["roles"]}
+    role_ids = dict(db.execute(select(Role.name, Role.id).where(Role.name.in_(role_names))).all()) if role_names else {}
+    missing_roles = role_names - role_ids.keys()
+    links = {
+        (existing[key], role_ids[name])
+        for key, rec in zip(keys, records)
+        if key not in skipped
+        for name in rec["roles"]
+        if name in role_ids
+    }
+    linked_user_ids = []
+    if links:
+        # Only links that were not there yet come back from RETURNING
+        linked_user_ids = db.scalars(
+            _insert_for(db, user_roles).on_conflict_do_nothing().returning(user_roles.c.user_id),
+            [{"user_id": uid, "role_id": rid} for uid, rid in links],
+        ).all()
+        # Core inserts bypass the ORM listeners, so keep the denormalized rows in step here
+        if linked_user_ids:
+            refresh_users(db, set(linked_user_ids))
+            # Existing users' tokens carry their old roles; users created here have none yet
+            bump_token_versions(db, set(linked_user_ids) - {existing[key] for key in new_keys})
+
+    return {
+        "users_created": len(new_keys),
+        "identities_upserted": len(identity_rows),
+        "role_links": len(linked_user_ids),
+        "missing_roles": sorted(missing_roles),
+        "skipped_duplicate_email": sorted(latest[key]["identifier"] for key in skipped),
+    }
+
+
+def _load_checkpoint(path: Optional[str], source: str) -> int:
+    if not path or not os.path.exists(path):
+        return 0
+    with open(path) as fh:
+        state = json.load(fh)
+    return state.get("records_done", 0) if state.get("source") == os.path.abspath(source) else 0
+
+
+def _save_checkpoint(path: Optional[str], source: str, records_done: int) -> None:
+    if not path:
+        return
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as fh:
+        json.dump({"source": os.path.abspath(source), "records_done": records_done}, fh)
+    os.replace(tmp, path)  # atomic, so a crash never leaves a torn checkpoint
+
+
+def _hash_batch(executor: Executor, records: list[dict]) -> list[Future]:
+    return [executor.submit(_hash, rec["password"], rec["provider"].value) for rec in records]
+
+
+def _batches(records: Iterable[tuple[int, dict]], size: int) -> Iterator[list[tuple[int, dict]]]:
+    iterator = iter(records)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def import_identities(
+    session_factory,
+    path: str,
+    *,
+    batch_size: int = 500,
+    workers: Optional[int] = None,
+    checkpoint_path: Optional[str] = None,
+    log=print,
+) -> dict:
+    """Import a CSV/JSONL file of identities, resuming after the last committed batch.
+
+    Argon2 hashing for the next batch runs on a process pool while the current
+    batch is written, and each batch is committed together with its checkpoint.
+    """
+    skip = _load_checkpoint(checkpoint_path, path)
+    if skip:
+        log(f"Resuming after {skip} record(s)")
+
+    totals = {"records": skip, "users_created": 0, "identities_upserted": 0, "role_links": 0, "invalid": 0, "skipped": 0}
+    missing_roles: set[str] = set()
+
+    def _valid(stream):
+        for line_no, raw in stream:
+            try:
+                yield line_no, prepare_record(raw)
+            except ImportRecordError as exc:
+                totals["invalid"] += 1
+                log(f"record {line_no}: {exc}")
+
+    numbered = islice(enumerate(read_records(path), start=1), skip, None)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: Optional[tuple[int, list[dict], list[Future]]] = None
+        for raw_batch in _batches(numbered, batch_size):
+            last_line = raw_batch[-1][0]
+            records = [rec for _, rec in _valid(raw_batch)]
+            upcoming = (last_line, records, _hash_batch(executor, records))
+            if pending:
+                _commit_batch(session_factory, path, checkpoint_path, pending, totals, missing_roles, log)
+            pending = upcoming
+        if pending:
+            _commit_batch(session_factory, path, checkpoint_path, pending, totals, missing_roles, log)
+
+    totals["missing_roles"] = sorted(missing_roles)
+    return totals
+
+
+def _commit_batch(session_factory, path, checkpoint_path, pending, totals, missing_roles, log) -> None:
+    last_line, records, futures = pending
+    hashes = [future.result() for future in futures]
+    if records:
+        db = session_factory()
+        try:
+            result = write_batch(db, records, hashes)
+            db.commit()
+        finally:
+            db.close()
+        for key in ("users_created", "identities_upserted", "role_links"):
+            totals[key] += result[key]
+        missing_roles.update(result["missing_roles"])
+        totals["skipped"] += len(result["skipped_duplicate_email"])
+        for identifier in result["skipped_duplicate_email"]:
+            log(f"{identifier}: skipped, email already belongs to another user")
+    totals["records"] = last_line
+    _save_checkpoint(checkpoint_path, path, last_line)
@@ -0,0 +1,70 @@
+from typing import Iterable, Optional
+from sqlalchemy import select, delete, insert, except_, func
+from sqlalchemy.orm import Session
+from src.db.models import user_roles, role_permissions, role_closure, user_effective_permissions
+
+
+BATCH_SIZE = 1000
+
+
+def expected_rows_select(user_ids: Optional[Iterable[int]] = None):
+    """SELECT of the (user_id, permission_id) pairs user_effective_permissions should hold."""
+    stmt = (
+        select(user_roles.c.user_id, role_permissions.c.permission_id)
+        .join(role_closure, role_closure.c.role_id == user_roles.c.role_id)
+        .join(role_permissions, role_permissions.c.role_id == role_closure.c.implied_role_id)
+        .distinct()
+    )
+    if user_ids is not None:
+        stmt = stmt.where(user_roles.c.user_id.in_(list(user_ids)))
+    return stmt
+
+
+def _batches(ids: Iterable[int]):
+    ids = sorted(set(ids))
+    for i in range(0, len(ids), BATCH_SIZE):
+        yield ids[i:i + BATCH_SIZE]
+
+
+def refresh_users(db: Session, user_ids: Iterable[int]) -> None:
+    """Recompute effective permissions for the given users, one delete+insert per batch."""
+    for batch in _batches(user_ids):
+        db.execute(delete(user_effective_permissions).where(user_effective_permissions.c.user_id.in_(batch)))
+        db.execute(
+            insert(user_effective_permissions).from_select(
+                ["user_id", "permission_id"], expected_rows_select(batch)
+            )
+        )
+
+
+def users_with_roles(db: Session, role_ids: Iterable[int]) -> set[int]:
+    """Users holding one of the given roles directly or through inheritance."""
+    role_ids = list(role_ids)
+    if not role_ids:
+        return set()
+    return set(db.scalars(
+        select(user_roles.c.user_id)
+        .join(role_closure, role_closure.c.role_id == user_roles.c.role_id)
+        .where(role_closure.c.implied_role_id.in_(role_ids))
+        .distinct()
+    ))
+
+
+def refresh_roles(db: Session, role_ids: Iterable[int]) -> None:
+    """Recompute effective permissions for every user holding (or inheriting) one of the given roles."""
+    refresh_users(db, users_with_roles(db, role_ids))
+
+
+def find_drift(db: Session) -> tuple[int, int]:
+    """Return (missing, extra) row counts between the table and the source join."""
+    actual = select(user_effective_permissions.c.user_id, user_effective_permissions.c.permission_id)
+    expected = expected_rows_select()
+    missing = db.scalar(select(func.count()).select_from(except_(expected, actual).subquery()))
+    extra = db.scalar(select(func.count()).select_from(except_(actual, expected).subquery()))
+    return missing, extra
+
+
+def rebuild_all(db: Session) -> None:
+    """Throw the table away and repopulate it from user_roles x role_closure x role_permissions."""
+    db.execute(delete(user_effective_permissions))
+    db.execute(insert(user_effective_permissions).from_select(["user_id", "permission_id"], expected_rows_select()))
@@ -0,0 +1,161 @@
+import atexit, os, queue, threading, time
+from datetime import datetime, timezone
+from typing import Callable, Optional
+from sqlalchemy import bindparam, insert, update
+from src.core.config import config
+from src.db.base import get_engine
+from src.db.models import LoginEvent, ProviderEnum, User
+
+
+_STOP = object()
+
+
+class LoginAuditWriter:
+    """Bounded in-memory queue of login events drained by one background thread.
+
+    record() never blocks a login: when the queue is full the event is dropped
+    and counted. The writer flushes a batch when it reaches `batch_size` events
+    or `flush_interval_s` after the first one, with one multi-row INSERT into
+    login_events and one executemany UPDATE of users.last_login_at.
+    """
+
+    def __init__(
+        self,
+        max_queue: int = 10000,
+        batch_size: int = 500,
+        flush_interval_s: float = 1.0,
+        engine_factory: Callable = get_engine,
+    ):
+        self.max_queue = max_queue
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_s = flush_interval_s
+        self.engine_factory = engine_factory
+        self._reset()
+
+    def _reset(self) -> None:
+        self._queue: queue.Queue = queue.Queue(self.max_queue)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self.recorded = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0  # events lost to failed batch writes
+        self.last_error: Optional[str] = None
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="login-audit", daemon=True)
+                    self._thread.start()
+
+    def record(
+        self,
+        user_id: Optional[int],
+        provider: Optional[ProviderEnum],
+        succeeded: bool,
+        client_ip: Optional[str] = None,
+    ) -> None:
+        """Queue one login attempt; drops it (and counts the drop) if the queue is full."""
+        if self._stopping:
+            return
+        self._ensure_started()
+        event = {
+            "user_id": user_id,
+            "provider": provider,
+            "succeeded": succeeded,
+            "client_ip": client_ip,
+            "created_at": datetime.now(timezone.utc),
+        }
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return
+        with self._lock:
+            self.recorded += 1
+
+    def _next_batch(self) -> list[dict]:
+        batch: list[dict] = []
+        try:
+            item = self._queue.get(timeout=self.flush_interval_s)
+        except queue.Empty:
+            return batch
+        deadline = time.monotonic() + self.flush_interval_s
+        while item is not _STOP:
+            batch.append(item)
+            remaining = deadline - time.monotonic()
+            if len(batch) >= self.batch_size or remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not (self._stopping and self._queue.empty()):
+            batch = self._next_batch()
+            if batch:
+                self._flush(batch)
+
+    def _flush(self, batch: list[dict]) -> None:
+        last_login: dict[int, datetime] = {}
+        for event in batch:
+            if event["succeeded"] and event["user_id"] is not None:
+                last_login[event["user_id"]] = max(event["created_at"], last_login.get(event["user_id"], event["created_at"]))
+        try:
+            # A plain connection on the primary: no ORM events, and no read-your-writes window for replicas
+            with self.engine_factory().begin() as conn:
+                conn.execute(insert(LoginEvent.__table__), batch)
+                if last_login:
+                    users = User.__table__
+                    conn.execute(
+                        update(users).where(users.c.id == bindparam("uid")).values(last_login_at=bindparam("ts")),
+                        [{"uid": uid, "ts": ts} for uid, ts in last_login.items()],
+                    )
+        except Exception as exc:  # keep the writer alive; the batch is counted as lost
+            with self._lock:
+                self.failed += len(batch)
+                self.last_error = repr(exc)
+            return
+        with self._lock:
+            self.written += len(batch)
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Stop accepting events and flush everything already queued."""
+        self._stopping = True
+        thread = self._thread
+        if thread is None:
+            return
+        try:
+            self._queue.put_nowait(_STOP)  # wake the writer now rather than at its next timeout
+        except queue.Full:
+            pass
+        thread.join(timeout)
+
+    def reset_after_fork(self) -> None:
+        # The writer thread does not survive fork(); the child starts its own on first use
+        self._reset()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "queued": self._queue.qsize(),
+                "recorded": self.recorded,
+                "dropped": self.dropped,
+                "written": self.written,
+                "failed": self.failed,
+                "last_error": self.last_error,
+            }
+
+
+login_audit = LoginAuditWriter(
+    max_queue=config.LOGIN_AUDIT_QUEUE_SIZE,
+    batch_size=config.LOGIN_AUDIT_BATCH_SIZE,
+    flush_interval_s=config.LOGIN_AUDIT_FLUSH_S,
+)
+os.register_at_fork(after_in_child=login_audit.reset_after_fork)
+atexit.register(login_audit.shutdown)
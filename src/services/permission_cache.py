@@ -0,0 +1,79 @@
+import threading
+from typing import Iterable, Optional
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import Session
+from src.db.models import Role, Permission, role_permissions, role_closure
+
+
+# Permissions of every role the requested roles inherit from, via the closure table.
+# Built once; the expanding bindparam keeps one compiled form per IN-list shape
+_ROLE_PERMISSIONS_STMT = (
+    select(Role.id, Role.name, Permission.code)
+    .outerjoin(role_closure, role_closure.c.role_id == Role.id)
+    .outerjoin(role_permissions, role_permissions.c.role_id == role_closure.c.implied_role_id)
+    .outerjoin(Permission, Permission.id == role_permissions.c.permission_id)
+    .where(Role.id.in_(bindparam("role_ids", expanding=True)))
+)
+
+
+class RolePermissionCache:
+    """In-process map of role id -> (role name, frozen effective permission codes).
+
+    Entries are tagged with the roles_version they were loaded under; when the
+    database reports a newer version the whole cache is dropped before use.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._entries: dict[int, tuple[str, frozenset[str]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self, db: Session, role_ids: Iterable[int]) -> dict[int, tuple[str, frozenset[str]]]:
+        names: dict[int, str] = {}
+        codes: dict[int, set[str]] = {}
+        for role_id, role_name, perm_code in db.execute(_ROLE_PERMISSIONS_STMT, {"role_ids": list(role_ids)}):
+            names[role_id] = role_name
+            bucket = codes.setdefault(role_id, set())
+            if perm_code:
+                bucket.add(perm_code)
+        return {role_id: (names[role_id], frozenset(codes[role_id])) for role_id in names}
+
+    def get_many(self, db: Session, role_ids: list[int], version: int) -> dict[int, tuple[str, frozenset[str]]]:
+        """Return entries for `role_ids`, loading any misses in one statement."""
+        with self._lock:
+            # A lagging read replica may report an older version; only a newer one evicts
+            if self._version is None or version > self._version:
+                self._entries = {}
+                self._version = version
+            found = {rid: self._entries[rid] for rid in role_ids if rid in self._entries}
+            missing = [rid for rid in role_ids if rid not in found]
+            self.hits += len(found)
+            self.misses += len(missing)
+
+        if missing:
+            loaded = self._load(db, missing)
+            with self._lock:
+                # Only keep them if nobody observed a newer version meanwhile
+                if self._version == version:
+                    self._entries.update(loaded)
+            found.update(loaded)
+        return found
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = {}
+            self._version = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "version": self._version,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+role_permission_cache = RolePermissionCache()
@@ -0,0 +1,57 @@
+import threading
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from src.db.models import Permission, RolesVersion
+from src.db.events import ROLES_VERSION_ROW_ID
+
+
+class PermissionRegistry:
+    """Process-wide snapshot of Permission.code -> bit_index.
+
+    Reloaded whenever roles_version moves (any permission insert/update/delete
+    bumps it). The registry version is roles_version.next_bit, the number of bits
+    ever allocated, so it only grows and is identical across processes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._roles_version: Optional[int] = None
+        self._snapshot: tuple[dict[str, int], int] = ({}, 0)
+
+    def sync(self, db: Session, roles_version: Optional[int], force: bool = False) -> tuple[dict[str, int], int]:
+        """Return (bit_index, registry_version), reloading if roles_version changed or `force` is set.
+
+        With roles_version None (caller has nothing to encode) the current snapshot is returned as-is.
+        """
+        with self._lock:
+            if not force and (roles_version is None or roles_version == self._roles_version):
+                return self._snapshot
+        rows = db.execute(select(Permission.code, Permission.bit_index)).all()
+        bit_index = {code: bit for code, bit in rows}
+        next_bit = db.scalar(select(RolesVersion.next_bit).where(RolesVersion.id == ROLES_VERSION_ROW_ID)) or 0
+        snapshot = (bit_index, max(next_bit, max(bit_index.values(), default=-1) + 1))
+        with self._lock:
+            self._snapshot = snapshot
+            self._roles_version = roles_version
+        return snapshot
+
+    def sync_latest(self, db: Session, force: bool = False) -> tuple[dict[str, int], int]:
+        """Like sync(), reading the current roles_version first."""
+        roles_version = db.scalar(select(RolesVersion.version).where(RolesVersion.id == ROLES_VERSION_ROW_ID))
+        return self.sync(db, roles_version or 0, force)
+
+    def snapshot(self) -> tuple[dict[str, int], int]:
+        with self._lock:
+            return self._snapshot
+
+    def as_dict(self) -> dict:
+        """Serializable form for services that decode `pbits` themselves."""
+        bit_index, version = self.snapshot()
+        codes: list[Optional[str]] = [None] * version
+        for code, bit in bit_index.items():
+            codes[bit] = code
+        return {"version": version, "codes": codes}
+
+
+permission_registry = PermissionRegistry()
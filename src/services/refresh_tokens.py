@@ -0,0 +1,62 @@
+import hashlib, secrets
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from src.core.config import config
+from src.db.models import RefreshToken
+from ._mirror import as_utc
+
+
+def hash_refresh_token(raw: str) -> str:
+    # Tokens are 256-bit random values, so a fast unsalted hash is enough
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def issue_refresh_token(db: Session, user_id: int, family_id: Optional[str] = None) -> tuple[str, RefreshToken]:
+    """Create a refresh token row and return (raw token, row). The raw token is never stored."""
+    raw = secrets.token_urlsafe(32)
+    now = datetime.now(timezone.utc)
+    row = RefreshToken(
+        user_id=user_id,
+        family_id=family_id or secrets.token_hex(16),
+        token_hash=hash_refresh_token(raw),
+        created_at=now,
+        expires_at=now + timedelta(days=config.REFRESH_TOKEN_EXPIRES_DAYS),
+    )
+    db.add(row)
+    db.flush()
+    return raw, row
+
+
+def revoke_family(db: Session, family_id: str) -> None:
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
+    )
+
+
+def rotate_refresh_token(db: Session, raw: str) -> Optional[tuple[str, RefreshToken]]:
+    """Consume a refresh token and issue its successor in the same family.
+
+    Presenting an already-used token means it leaked: the whole family is revoked.
+    """
+    current = db.scalar(
+        select(RefreshToken).where(RefreshToken.token_hash == hash_refresh_token(raw)).with_for_update()
+    )
+    if current is None:
+        return None
+
+    now = datetime.now(timezone.utc)
+    if current.revoked_at is not None:
+        revoke_family(db, current.family_id)
+        db.commit()
+        return None
+    if as_utc(current.expires_at) <= now:
+        return None
+
+    new_raw, successor = issue_refresh_token(db, current.user_id, current.family_id)
+    current.revoked_at = now
+    current.replaced_by_id = successor.id
+    return new_raw, successor
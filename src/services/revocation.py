@@ -0,0 +1,56 @@
+import time
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from src.core.config import config
+from src.db.models import RevokedAccessToken
+from ._mirror import TableMirror, as_utc
+
+
+class RevocationList(TableMirror):
+    """In-memory mirror of revoked_access_tokens for O(1) checks on every request.
+
+    Rows are pulled incrementally by id (the table is append-only) at most every
+    `sync_interval` seconds; entries are forgotten once the token has expired anyway.
+    """
+
+    # Ids are handed out before commit, so a slow transaction can land below the cursor;
+    # re-reading a window behind it catches those late rows
+    SYNC_LOOKBACK_ROWS = 1000
+
+    def __init__(self, sync_interval: float = 5.0):
+        super().__init__(sync_interval)
+        self._revoked: dict[str, float] = {}  # jti -> exp (unix seconds)
+        self._cursor = 0
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        return jti is not None and jti in self._revoked
+
+    def revoke(self, db: Session, jti: str, exp: float) -> None:
+        """Persist a revocation and apply it locally right away."""
+        db.add(RevokedAccessToken(jti=jti, expires_at=datetime.fromtimestamp(exp, timezone.utc)))
+        db.flush()
+        with self._lock:
+            self._revoked[jti] = exp
+
+    def sync(self, db: Session) -> None:
+        now = time.time()
+        rows = db.execute(
+            select(RevokedAccessToken.id, RevokedAccessToken.jti, RevokedAccessToken.expires_at)
+            .where(RevokedAccessToken.id > self._cursor - self.SYNC_LOOKBACK_ROWS)
+            .order_by(RevokedAccessToken.id)
+        ).all()
+        with self._lock:
+            for row_id, jti, expires_at in rows:
+                self._revoked[jti] = as_utc(expires_at).timestamp()
+                self._cursor = max(self._cursor, row_id)
+            self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+            self._synced()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"revoked": len(self._revoked), "cursor": self._cursor, "last_sync": self._last_sync}
+
+
+revocation_list = RevocationList(config.REVOCATION_SYNC_S)
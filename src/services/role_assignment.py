@@ -0,0 +1,128 @@
+from typing import Iterable, Optional
+from sqlalchemy import and_, delete, exists, insert, literal, select
+from sqlalchemy.orm import Session
+from src.db.models import AuthIdentity, ProviderEnum, Role, User, user_roles
+from ._normalize import normalize_identifier
+from .effective_permissions import _batches, refresh_users
+from .token_versions import bump_token_versions
+
+
+class RoleAssignmentError(ValueError):
+    """Raised for an unknown role or an invalid target filter."""
+
+
+def resolve_targets(
+    db: Session,
+    *,
+    user_ids: Optional[Iterable[int]] = None,
+    provider: Optional[ProviderEnum] = None,
+    identifiers: Optional[Iterable[str]] = None,
+    identifier_prefix: Optional[str] = None,
+) -> set[int]:
+    """Ids of existing users matching any of the given targets.
+
+    `identifiers` (exact) and `identifier_prefix` (e.g. room "3" for the third floor)
+    match identities of `provider` after normalization.
+    """
+    conditions = []
+    if user_ids:
+        conditions.append(User.id.in_(list(user_ids)))
+    if identifiers or identifier_prefix:
+        if provider is None:
+            raise RoleAssignmentError("provider is required with identifiers or identifier_prefix")
+        ident_col = AuthIdentity.identifier_normalized
+        matches = []
+        if identifiers:
+            matches.append(ident_col.in_([normalize_identifier(provider, ident) for ident in identifiers]))
+        if identifier_prefix:
+            matches.append(ident_col.startswith(normalize_identifier(provider, identifier_prefix), autoescape=True))
+        for match in matches:
+            conditions.append(exists().where(AuthIdentity.user_id == User.id, AuthIdentity.provider == provider, match))
+    if not conditions:
+        return set()
+
+    found = set()
+    for condition in conditions:
+        found.update(db.scalars(select(User.id).where(condition)))
+    return found
+
+
+def assign_role(db: Session, role_id: int, user_ids: Iterable[int]) -> int:
+    """Give `role_id` to every user in `user_ids`; returns how many links were added."""
+    added = 0
+    for batch in _batches(user_ids):
+        already = exists().where(and_(user_roles.c.user_id == User.id, user_roles.c.role_id == role_id))
+        changed_ids = db.scalars(
+            insert(user_roles)
+            .from_select(
+                ["user_id", "role_id"],
+                select(User.id, literal(role_id)).where(User.id.in_(batch), ~already),
+            )
+            .returning(user_roles.c.user_id)
+        ).all()
+        added += len(changed_ids)
+        if changed_ids:
+            refresh_users(db, changed_ids)
+            bump_token_versions(db, changed_ids)
+    return added
+
+
+def revoke_role(db: Session, role_id: int, user_ids: Iterable[int]) -> int:
+    """Take `role_id` away from every user in `user_ids`; returns how many links were removed."""
+    removed = 0
+    for batch in _batches(user_ids):
+        changed_ids = db.scalars(
+            delete(user_roles)
+            .where(user_roles.c.role_id == role_id, user_roles.c.user_id.in_(batch))
+            .returning(user_roles.c.user_id)
+        ).all()
+        removed += len(changed_ids)
+        if changed_ids:
+            refresh_users(db, changed_ids)
+            bump_token_versions(db, changed_ids)
+    return removed
+
+
+def change_role_membership(
+    db: Session,
+    *,
+    role_name: str,
+    action: str,
+    user_ids: Optional[Iterable[int]] = None,
+    provider: Optional[ProviderEnum] = None,
+    identifiers: Optional[Iterable[str]] = None,
+    identifier_prefix: Optional[str] = None,
+) -> dict:
+    """Assign or revoke one role for many users with one INSERT/DELETE per batch. Idempotent.
+
+    Core statements bypass the ORM listeners, so effective permissions and token
+    versions of the users a batch actually changed are updated here. The caller commits.
+    """
+    if action not in ("assign", "revoke"):
+        raise RoleAssignmentError(f"Unknown action {action!r}")
+    role_id = db.scalar(select(Role.id).where(Role.name == role_name))
+    if role_id is None:
+        raise RoleAssignmentError(f"Unknown role {role_name!r}")
+
+    requested_ids = set(user_ids or ())
+    targets = resolve_targets(
+        db,
+        user_ids=requested_ids,
+        provider=provider,
+        identifiers=identifiers,
+        identifier_prefix=identifier_prefix,
+    )
+    changed = (assign_role if action == "assign" else revoke_role)(db, role_id, targets)
+    # Users already loaded in this session must not keep serving their old roles or token version
+    for obj in db.identity_map.values():
+        if isinstance(obj, User) and obj.id in targets:
+            db.expire(obj, ["roles", "token_version", "token_version_changed_at"])
+
+    return {
+        "role": role_name,
+        "action": action,
+        "matched": len(targets),
+        "changed": changed,
+        "unchanged": len(targets) - changed,
+        "missing_user_ids": sorted(requested_ids - targets),
+    }
@@ -0,0 +1,147 @@
+from typing import Iterable
+from sqlalchemy import select, delete, insert, exists, and_
+from sqlalchemy.orm import Session
+from src.db.models import Role, role_inheritance, role_closure
+from src.db.events import bump_roles_version
+
+
+class RoleHierarchyError(ValueError):
+    """Raised when an inheritance edge would create a cycle."""
+
+
+def implied_roles_select(role_ids: Iterable[int]):
+    """SELECT of every role id implied by (inherited through) the given roles, themselves included."""
+    return select(role_closure.c.implied_role_id).where(role_closure.c.role_id.in_(list(role_ids)))
+
+
+def inheriting_roles(db: Session, role_ids: Iterable[int]) -> set[int]:
+    """Roles that imply any of the given roles, themselves included."""
+    role_ids = list(role_ids)
+    if not role_ids:
+        return set()
+    return set(db.scalars(
+        select(role_closure.c.role_id).where(role_closure.c.implied_role_id.in_(role_ids)).distinct()
+    ))
+
+
+def ensure_self_rows(db: Session, role_ids: Iterable[int]) -> None:
+    """Insert the (role, role) closure rows for roles that do not have one yet."""
+    for role_id in set(role_ids):
+        db.execute(
+            insert(role_closure).from_select(
+                ["role_id", "implied_role_id"],
+                select(Role.id, Role.id).where(
+                    Role.id == role_id,
+                    ~exists().where(and_(role_closure.c.role_id == role_id, role_closure.c.implied_role_id == role_id)),
+                ),
+            )
+        )
+
+
+def _after_hierarchy_change(db: Session, role_ids: set[int]) -> None:
+    # Every role implying `role_ids` may have changed: drop cached role entries, fix user rows
+    # and invalidate tokens minted with the old effective roles
+    from src.services.effective_permissions import refresh_users, users_with_roles
+    from src.services.token_versions import bump_token_versions
+
+    bump_roles_version(db)
+    user_ids = users_with_roles(db, role_ids)
+    refresh_users(db, user_ids)
+    bump_token_versions(db, user_ids)
+
+
+def add_inheritance(db: Session, role_id: int, inherited_role_id: int) -> None:
+    """Make `role_id` inherit `inherited_role_id`, extending the closure incrementally."""
+    if role_id == inherited_role_id or db.scalar(
+        select(exists().where(and_(
+            role_closure.c.role_id == inherited_role_id,
+            role_closure.c.implied_role_id == role_id,
+        )))
+    ):
+        raise RoleHierarchyError(f"Role {inherited_role_id} already inherits role {role_id}")
+
+    already_linked = db.scalar(select(exists().where(and_(
+        role_inheritance.c.role_id == role_id,
+        role_inheritance.c.inherited_role_id == inherited_role_id,
+    ))))
+    if already_linked:
+        return
+
+    db.execute(insert(role_inheritance).values(role_id=role_id, inherited_role_id=inherited_role_id))
+
+    # Every ancestor of role_id now reaches every descendant of inherited_role_id
+    ancestors = role_closure.alias("ancestors")
+    descendants = role_closure.alias("descendants")
+    new_pairs = (
+        select(ancestors.c.role_id, descendants.c.implied_role_id)
+        .join(descendants, descendants.c.role_id == inherited_role_id)
+        .where(
+            ancestors.c.implied_role_id == role_id,
+            ~exists().where(and_(
+                role_closure.c.role_id == ancestors.c.role_id,
+                role_closure.c.implied_role_id == descendants.c.implied_role_id,
+            )),
+        )
+        .distinct()
+    )
+    db.execute(insert(role_closure).from_select(["role_id", "implied_role_id"], new_pairs))
+
+    _after_hierarchy_change(db, {inherited_role_id})
+
+
+def _expected_closure(db: Session, role_ids: Iterable[int]) -> set[tuple[int, int]]:
+    """(role_id, implied_role_id) pairs the closure should hold for the given roles."""
+    edges: dict[int, list[int]] = {}
+    for parent, child in db.execute(select(role_inheritance.c.role_id, role_inheritance.c.inherited_role_id)):
+        edges.setdefault(parent, []).append(child)
+
+    pairs = set()
+    for role_id in role_ids:
+        reached = {role_id}
+        stack = [role_id]
+        while stack:
+            for child in edges.get(stack.pop(), ()):
+                if child not in reached:
+                    reached.add(child)
+                    stack.append(child)
+        pairs.update((role_id, implied) for implied in reached)
+    return pairs
+
+
+def recompute_closure(db: Session, role_ids: Iterable[int]) -> None:
+    """Rebuild the closure rows of the given roles from the inheritance edges."""
+    role_ids = set(role_ids)
+    if not role_ids:
+        return
+
+    rows = [{"role_id": role_id, "implied_role_id": implied} for role_id, implied in _expected_closure(db, role_ids)]
+    db.execute(delete(role_closure).where(role_closure.c.role_id.in_(role_ids)))
+    db.execute(insert(role_closure), rows)
+
+
+def find_closure_drift(db: Session) -> tuple[int, int]:
+    """Return (missing, extra) row counts between role_closure and the inheritance edges."""
+    expected = _expected_closure(db, db.scalars(select(Role.id)).all())
+    actual = set(db.execute(select(role_closure.c.role_id, role_closure.c.implied_role_id)).all())
+    return len(expected - actual), len(actual - expected)
+
+
+def remove_inheritance(db: Session, role_id: int, inherited_role_id: int) -> None:
+    """Drop an inheritance edge and recompute the closure of the roles that went through it."""
+    result = db.execute(delete(role_inheritance).where(
+        role_inheritance.c.role_id == role_id,
+        role_inheritance.c.inherited_role_id == inherited_role_id,
+    ))
+    if result.rowcount == 0:
+        return
+
+    # Only ancestors of role_id (role_id included) can have lost paths
+    recompute_closure(db, inheriting_roles(db, [role_id]))
+
+    _after_hierarchy_change(db, {role_id})
+
+
+def rebuild_closure(db: Session) -> None:
+    """Recompute the whole closure table from role_inheritance."""
+    recompute_closure(db, db.scalars(select(Role.id)))
+    bump_roles_version(db)
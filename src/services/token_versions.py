@@ -0,0 +1,110 @@
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from src.core.config import config
+from src.db.models import User
+from ._mirror import TableMirror, as_utc
+from .effective_permissions import _batches
+
+
+PENDING_KEY = "token_versions_pending"
+
+
+class TokenVersionMap(TableMirror):
+    """In-memory user_id -> users.token_version for O(1) staleness checks on every request.
+
+    A token whose "tv" claim is below the user's current version was issued before
+    the user was deactivated or had their roles changed, and is rejected. Only bumps
+    from the last access-token lifetime are held: every token issued before an older
+    bump has expired anyway. Rows are pulled in bulk by token_version_changed_at at
+    most every `sync_interval` seconds; bumps committed by this process apply at once.
+    """
+
+    # Bumps are stamped before commit (and by other hosts' clocks), so a slow transaction
+    # can land below the cursor; re-reading a window behind it catches those late rows
+    SYNC_LOOKBACK = timedelta(seconds=60)
+
+    def __init__(self, sync_interval: float = 5.0, token_lifetime_s: float = 3600):
+        super().__init__(sync_interval)
+        # A token issued just before a bump stays valid for token_lifetime_s after it
+        self.retention = timedelta(seconds=token_lifetime_s) + self.SYNC_LOOKBACK
+        self._versions: dict[int, tuple[int, float]] = {}  # user_id -> (version, changed_at unix seconds)
+        self._cursor: Optional[datetime] = None
+        self.rejected = 0
+
+    def is_current(self, user_id, token_version: int) -> bool:
+        try:
+            entry = self._versions.get(int(user_id))
+        except (TypeError, ValueError):
+            return False
+        if entry is not None and token_version < entry[0]:
+            self.rejected += 1
+            return False
+        return True
+
+    def apply(self, versions: dict[int, int], changed_at: Optional[float] = None) -> None:
+        """Record versions written by this process; never moves one backwards."""
+        self._apply({user_id: (version, changed_at or time.time()) for user_id, version in versions.items()})
+
+    def _apply(self, entries: dict[int, tuple[int, float]]) -> None:
+        with self._lock:
+            for user_id, (version, changed_at) in entries.items():
+                current = self._versions.get(user_id)
+                if current is None or version > current[0]:
+                    self._versions[user_id] = (version, changed_at)
+
+    def sync(self, db: Session) -> None:
+        now = datetime.now(timezone.utc)
+        since = now - self.retention
+        if self._cursor is not None:
+            since = max(since, self._cursor - self.SYNC_LOOKBACK)
+        rows = db.execute(
+            select(User.id, User.token_version, User.token_version_changed_at)
+            .where(User.token_version_changed_at >= since)
+        ).all()
+        entries = {user_id: (version, as_utc(changed_at).timestamp()) for user_id, version, changed_at in rows}
+        self._apply(entries)
+
+        horizon = (now - self.retention).timestamp()
+        with self._lock:
+            self._versions = {user_id: entry for user_id, entry in self._versions.items() if entry[1] > horizon}
+            latest = max((as_utc(changed_at) for _, _, changed_at in rows), default=now)
+            self._cursor = max(self._cursor or latest, latest)
+            self._synced()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._versions.clear()
+            self._cursor = None
+            self._last_sync = 0.0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"users": len(self._versions), "rejected": self.rejected, "last_sync": self._last_sync}
+
+
+token_version_map = TokenVersionMap(config.TOKEN_VERSION_SYNC_S, config.ACCESS_TOKEN_EXPIRES_MIN * 60)
+
+
+def bump_token_versions(db: Session, user_ids: Iterable[int]) -> dict[int, int]:
+    """Invalidate every access token issued so far to `user_ids`, one UPDATE per batch.
+
+    For Core writes that bypass the ORM listeners in src/db/events.py. The new
+    versions reach this process's map when the caller commits.
+    """
+    users = User.__table__
+    now = datetime.now(timezone.utc)
+    versions = {}
+    for batch in _batches(user_ids):
+        rows = db.execute(
+            update(users)
+            .where(users.c.id.in_(batch))
+            .values(token_version=users.c.token_version + 1, token_version_changed_at=now)
+            .returning(users.c.id, users.c.token_version)
+        ).all()
+        versions.update({user_id: version for user_id, version in rows})
+    if versions:
+        db.info.setdefault(PENDING_KEY, {}).update(versions)
+    return versions
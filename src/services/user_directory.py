@@ -0,0 +1,58 @@
+from typing import Optional
+from sqlalchemy import exists, select
+from sqlalchemy.orm import Session, selectinload
+from src.db.base import replica_reads
+from src.db.models import AuthIdentity, ProviderEnum, Role, User
+
+
+MAX_PAGE_SIZE = 200
+
+
+def list_users(
+    db: Session,
+    *,
+    after: int = 0,
+    limit: int = 50,
+    provider: Optional[ProviderEnum] = None,
+    is_active: Optional[bool] = None,
+) -> tuple[list[User], Optional[int]]:
+    """One keyset page of users (id > after) with identities and roles batch-loaded.
+
+    Returns (users, next_after); next_after is None on the last page. Each page
+    costs three statements however many users it holds.
+    """
+    stmt = (
+        select(User)
+        .where(User.id > after)
+        .order_by(User.id)
+        .limit(limit + 1)  # one extra row tells us whether another page exists
+        .options(selectinload(User.identities), selectinload(User.roles))
+    )
+    if is_active is not None:
+        stmt = stmt.where(User.is_active == is_active)  # ix_users_is_active_id
+    if provider is not None:
+        stmt = stmt.where(
+            exists().where(AuthIdentity.user_id == User.id, AuthIdentity.provider == provider)  # ix_auth_identities_provider_user_id
+        )
+
+    with replica_reads(db):
+        users = list(db.scalars(stmt))
+    if len(users) > limit:
+        return users[:limit], users[limit - 1].id
+    return users, None
+
+
+def list_roles(db: Session, *, after: int = 0, limit: int = 50) -> tuple[list[Role], Optional[int]]:
+    """One keyset page of roles (id > after) with their direct permissions batch-loaded."""
+    stmt = (
+        select(Role)
+        .where(Role.id > after)
+        .order_by(Role.id)
+        .limit(limit + 1)
+        .options(selectinload(Role.permissions))
+    )
+    with replica_reads(db):
+        roles = list(db.scalars(stmt))
+    if len(roles) > limit:
+        return roles[:limit], roles[limit - 1].id
+    return roles, None
@@ -0,0 +1,83 @@
+import json, os, sys, tempfile
+
+# Settings are read at import time, so the test environment is set up before anything from src is imported
+_TMP_DIR = tempfile.mkdtemp(prefix="hamilton-tests-")
+_POLICY_FILE = os.path.join(_TMP_DIR, "hash_policy.json")
+with open(_POLICY_FILE, "w") as fh:
+    # Cheapest Argon2 settings: the tests exercise the login flow, not hash strength
+    json.dump({"default": {"time_cost": 1, "memory_cost": 8192, "parallelism": 1}, "providers": {}}, fh)
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP_DIR, 'test.db')}")
+os.environ.setdefault("HASH_POLICY_FILE", _POLICY_FILE)
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("LOGIN_AUDIT_ENABLED", "false")  # its background writes would show up in statement counts
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import event
+from src.db.base import Base, SessionLocal, get_engine
+from src.db.models import ProviderEnum
+
+
+@pytest.fixture(scope="session")
+def engine():
+    engine = get_engine()
+
+    @event.listens_for(engine, "connect")
+    def _enable_foreign_keys(dbapi_conn, record):
+        dbapi_conn.execute("PRAGMA foreign_keys=ON")
+
+    return engine
+
+
+@pytest.fixture
+def seeded(engine):
+    """Fresh schema with a superadmin (a@x.com / pw), a username (Concierge01 / pw2) and a room (101 / 1234)."""
+    from src.db.seed_superadmin import upsert_user_with_identity
+    from src.services.permission_cache import role_permission_cache
+    from src.services.token_versions import token_version_map
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    role_permission_cache.clear()
+    # Versions seen against an earlier test's database would reject this one's tokens
+    token_version_map.clear()
+    db = SessionLocal()
+    try:
+        upsert_user_with_identity(
+            db, full_name="Admin", provider=ProviderEnum.email, identifier="a@x.com",
+            password_plaintext="pw", email_for_profile="a@x.com", make_superadmin=True,
+        )
+        upsert_user_with_identity(db, full_name="Concierge", provider=ProviderEnum.username, identifier="Concierge01", password_plaintext="pw2")
+        upsert_user_with_identity(db, full_name="Guest", provider=ProviderEnum.room, identifier="101", password_plaintext="1234")
+        db.commit()
+    finally:
+        db.close()
+    return engine
+
+
+@pytest.fixture
+def async_engine(seeded, monkeypatch):
+    """Point asgi.py at the test database file through the async SQLite driver."""
+    from sqlalchemy.engine import make_url
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from src.core.config import config
+    from src.db import async_base
+
+    engine = create_async_engine(make_url(config.DATABASE_URL).set(drivername="sqlite+aiosqlite"))
+    monkeypatch.setattr(async_base, "_async_engine", engine)
+    yield engine
+    engine.sync_engine.dispose()
+
+
+@pytest.fixture
+def statements(seeded):
+    """SQL statements sent to the database from the moment the fixture is used."""
+    captured: list[str] = []
+
+    def _record(conn, cursor, statement, *args):
+        captured.append(statement)
+
+    event.listen(seeded, "before_cursor_execute", _record)
+    yield captured
+    event.remove(seeded, "before_cursor_execute", _record)
@@ -0,0 +1,66 @@
+import json
+from sqlalchemy import func, select
+from src.db.base import SessionLocal
+from src.db.models import AuthIdentity, User
+from src.services.bulk_import import import_identities, prepare_record, write_batch
+from src.services.effective_permissions import find_drift
+
+
+def _records(*rows):
+    return [prepare_record({"provider": "room", "password": "0000", **row}) for row in rows]
+
+
+def _write(records):
+    db = SessionLocal()
+    try:
+        result = write_batch(db, records, ["hash"] * len(records))
+        db.commit()
+        return result
+    finally:
+        db.close()
+
+
+def test_duplicate_emails_are_skipped(seeded):
+    result = _write(_records(
+        {"identifier": "201", "email": "a@x.com", "full_name": "Taken"},   # taken by the seeded superadmin
+        {"identifier": "202", "email": "guest@x.com"},
+        {"identifier": "203", "email": "guest@x.com", "full_name": "Dup"},  # same as the record before it
+        {"identifier": "204"},
+    ))
+    assert result["skipped_duplicate_email"] == ["201", "203"]
+    assert result["users_created"] == 2
+    assert result["identities_upserted"] == 2
+
+    db = SessionLocal()
+    idents = set(db.scalars(select(AuthIdentity.identifier).where(AuthIdentity.identifier.in_(["201", "202", "203", "204"]))))
+    assert idents == {"202", "204"}
+    assert db.scalar(select(func.count()).select_from(User).where(User.email == "guest@x.com")) == 1
+    assert db.scalar(select(func.count()).select_from(User).where(User.full_name.in_(["Taken", "Dup"]))) == 0
+    db.close()
+
+
+def test_role_links_count_only_new_links(seeded):
+    rows = [{"identifier": "301", "roles": "superadmin"}, {"identifier": "302", "roles": "superadmin"}]
+    assert _write(_records(*rows))["role_links"] == 2
+    assert _write(_records(*rows))["role_links"] == 0
+
+    db = SessionLocal()
+    assert find_drift(db) == (0, 0)
+    db.close()
+
+
+def test_import_reports_skipped_records(seeded, tmp_path):
+    source = tmp_path / "residents.jsonl"
+    source.write_text("\n".join(json.dumps(row) for row in [
+        {"provider": "room", "identifier": "401", "password": "1111", "email": "a@x.com"},
+        {"provider": "room", "identifier": "402", "password": "2222", "roles": "superadmin"},
+    ]))
+    logged = []
+    totals = import_identities(SessionLocal, str(source), workers=1, log=logged.append)
+    assert totals["skipped"] == 1
+    assert totals["users_created"] == 1
+    assert totals["role_links"] == 1
+    assert logged == ["401: skipped, email already belongs to another user"]
+
+    totals = import_identities(SessionLocal, str(source), workers=1, log=logged.append)
+    assert totals["role_links"] == 0
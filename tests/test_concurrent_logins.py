@@ -0,0 +1,27 @@
+from concurrent.futures import ThreadPoolExecutor
+from app import create_app
+from src.db.base import get_engine, pool_stats
+
+THREADS = 8
+LOGINS = 48
+USERS = [("a@x.com", "pw"), ("Concierge01", "pw2"), ("101", "1234")]
+
+
+def test_parallel_logins_return_every_connection(seeded):
+    app = create_app()
+
+    def login(i):
+        identifier, password = USERS[i % len(USERS)]
+        with app.test_client() as client:
+            resp = client.post("/auth/login", json={"identifier": identifier, "password": password})
+            return resp.status_code
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        statuses = list(pool.map(login, range(LOGINS)))
+
+    assert statuses == [200] * LOGINS
+    assert get_engine().pool.checkedout() == 0
+    stats = pool_stats()
+    assert stats["checked_out"] == 0
+    assert stats["checkout_timeouts"] == 0
+    assert stats["checkouts"] > 0
@@ -0,0 +1,47 @@
+from sqlalchemy import delete, select
+from src.db import rebuild_effective_permissions
+from src.db.base import SessionLocal
+from src.db.models import Role, User, role_closure
+from src.services.effective_permissions import find_drift
+from src.services.role_hierarchy import add_inheritance, find_closure_drift
+
+
+def _role(db, name):
+    return db.scalar(select(Role).where(Role.name == name))
+
+
+def test_membership_changed_from_role_side(seeded):
+    db = SessionLocal()
+    superadmin = _role(db, "superadmin")
+    superadmin.users.append(db.get(User, 2))
+    db.commit()
+    assert find_drift(db) == (0, 0)
+
+    superadmin.users.remove(db.get(User, 1))
+    db.commit()
+    assert find_drift(db) == (0, 0)
+
+    db.add(Role(name="night", users=[db.get(User, 3)], permissions=list(superadmin.permissions)))
+    db.commit()
+    assert find_drift(db) == (0, 0)
+    db.close()
+
+
+def test_check_reports_stale_closure(seeded, capsys):
+    db = SessionLocal()
+    night = Role(name="night")
+    db.add(night)
+    db.commit()
+    add_inheritance(db, night.id, _role(db, "superadmin").id)
+    db.commit()
+    assert find_closure_drift(db) == (0, 0)
+    assert rebuild_effective_permissions.run(["--check"]) == 0
+
+    db.execute(delete(role_closure).where(role_closure.c.role_id == night.id, role_closure.c.implied_role_id != night.id))
+    db.commit()
+    db.close()
+    assert rebuild_effective_permissions.run(["--check"]) == 1
+    assert "role_closure: 1 missing row(s)" in capsys.readouterr().out
+
+    assert rebuild_effective_permissions.run([]) == 0
+    assert rebuild_effective_permissions.run(["--check"]) == 0
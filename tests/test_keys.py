@@ -0,0 +1,35 @@
+import os, time
+from src.core.config import config
+from src.core.keys import KeyRing, generate_key
+
+
+def _key_with_mtime(directory, alg, mtime):
+    kid = generate_key(directory, alg)
+    os.utime(os.path.join(directory, f"{kid}.pem"), (mtime, mtime))
+    return kid
+
+
+def test_new_key_signs_once_settled_without_directory_change(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "JWKS_MAX_AGE_S", 1)
+    now = time.time()
+    old_kid = _key_with_mtime(str(tmp_path), "EdDSA", now - 100)
+    new_kid = _key_with_mtime(str(tmp_path), "ES256", now - 0.5)
+
+    ring = KeyRing(str(tmp_path))
+    assert ring.signing_key()[0] == old_kid
+    assert {jwk["kid"] for jwk in ring.jwks()["keys"]} == {old_kid, new_kid}
+
+    time.sleep(0.6)
+    kid, _, alg = ring.signing_key()
+    assert (kid, alg) == (new_kid, "ES256")
+
+
+def test_active_kid_is_kept(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "JWKS_MAX_AGE_S", 1)
+    now = time.time()
+    old_kid = _key_with_mtime(str(tmp_path), "EdDSA", now - 100)
+    _key_with_mtime(str(tmp_path), "EdDSA", now - 0.5)
+
+    ring = KeyRing(str(tmp_path), active_kid=old_kid)
+    time.sleep(0.6)
+    assert ring.signing_key()[0] == old_kid
@@ -0,0 +1,90 @@
+"""The same login behaviour from the Flask app (app.py) and the ASGI app (asgi.py)."""
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from src.core.config import config
+from src.core.jwt_tools import decode_access_token
+from src.core.rate_limit import login_identifier_limiter
+from src.services.auth_service import AuthService
+
+# Claims that differ between any two tokens
+PER_TOKEN_CLAIMS = ("iat", "exp", "jti")
+
+
+@pytest.fixture(params=["flask", "asgi"])
+def client(request, seeded):
+    if request.param == "flask":
+        from app import create_app
+
+        with create_app().test_client() as flask_client:
+            yield flask_client
+    else:
+        from starlette.testclient import TestClient
+        from asgi import create_app
+
+        request.getfixturevalue("async_engine")
+        with TestClient(create_app()) as asgi_client:
+            yield asgi_client
+
+
+def _login(client, identifier, password, **extra):
+    return client.post("/auth/login", json={"identifier": identifier, "password": password, **extra})
+
+
+def _body(resp):
+    # Flask's test response has a `json` property, httpx's a json() method
+    return resp.json() if callable(resp.json) else resp.json
+
+
+def _claims(resp):
+    claims = decode_access_token(_body(resp)["access_token"])
+    return {key: value for key, value in claims.items() if key not in PER_TOKEN_CLAIMS}
+
+
+@pytest.mark.parametrize("identifier,password,provider", [
+    ("a@x.com", "pw", None),
+    ("Concierge01", "pw2", None),
+    ("101", "1234", "room"),
+])
+def test_successful_login(client, identifier, password, provider):
+    resp = _login(client, identifier, password, provider=provider)
+    assert resp.status_code == 200
+    body = _body(resp)
+    assert set(body) == {"access_token", "refresh_token", "token_type"}
+    assert body["token_type"] == "bearer"
+
+
+@pytest.mark.parametrize("identifier,password", [("a@x.com", "wrong"), ("nobody@x.com", "pw"), ("", "")])
+def test_failed_login(client, identifier, password):
+    resp = _login(client, identifier, password)
+    assert resp.status_code == 401
+    assert _body(resp) == {"details": "Invalid credentials"}
+
+
+def test_rate_limited(client, monkeypatch):
+    monkeypatch.setattr(config, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(login_identifier_limiter, "hit", lambda key: 4.2)
+    resp = _login(client, "a@x.com", "pw")
+    assert resp.status_code == 429
+    assert resp.headers["Retry-After"] == "5"
+
+
+def test_pool_exhausted(client, monkeypatch):
+    def exhausted(*args, **kwargs):
+        raise PoolTimeoutError("QueuePool limit reached")
+
+    monkeypatch.setattr(AuthService, "_lookup_identity", exhausted)
+    resp = _login(client, "a@x.com", "pw")
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
+
+
+def test_tokens_match(seeded, async_engine):
+    from starlette.testclient import TestClient
+    import app, asgi
+
+    with app.create_app().test_client() as flask_client, TestClient(asgi.create_app()) as asgi_client:
+        for identifier, password in (("a@x.com", "pw"), ("Concierge01", "pw2"), ("101", "1234")):
+            sync_claims = _claims(_login(flask_client, identifier, password))
+            async_claims = _claims(_login(asgi_client, identifier, password))
+            assert sync_claims == async_claims
+            assert sync_claims["sub"]
@@ -0,0 +1,48 @@
+from src.db.base import SessionLocal
+from src.services.auth_service import AuthService
+from src.services.permission_cache import role_permission_cache
+
+
+def _login(identifier, password):
+    db = SessionLocal()
+    try:
+        return AuthService().login(db, identifier=identifier, password=password)
+    finally:
+        db.close()
+
+
+def test_successful_login_statement_count(statements):
+    # Identity + user in one statement, then role ids (with roles_version), then the
+    # role permission cache fill; the same count whatever the number of roles
+    assert _login("a@x.com", "pw")
+    assert len(statements) == 3, statements
+
+    # With the role permission cache warm only the two per-login reads remain
+    statements.clear()
+    assert _login("a@x.com", "pw")
+    assert len(statements) == 2, statements
+
+
+def test_failed_login_statement_count(statements):
+    # Wrong password: only the identity lookup runs
+    assert _login("a@x.com", "wrong") is None
+    assert len(statements) == 1, statements
+
+    statements.clear()
+    assert _login("nobody@x.com", "pw") is None
+    assert len(statements) == 1, statements
+
+
+def test_statement_count_does_not_grow_with_roles(statements):
+    from src.db.models import Permission, Role, User
+
+    db = SessionLocal()
+    user = db.get(User, 1)
+    user.roles.extend(Role(name=f"extra{i}", permissions=[Permission(code=f"extra{i}:read")]) for i in range(5))
+    db.commit()
+    db.close()
+    role_permission_cache.clear()
+
+    statements.clear()
+    assert _login("a@x.com", "pw")
+    assert len(statements) == 3, statements
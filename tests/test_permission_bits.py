@@ -0,0 +1,103 @@
+from src.core.config import config
+from src.core.jwt_tools import decode_access_token
+from src.core.perm_bits import PermissionBits
+from src.db.base import SessionLocal
+from src.services.auth_service import AuthService
+from src.services.permission_registry import permission_registry
+
+ADMIN_PERMS = ["user:assign-role", "user:read", "user:write"]
+
+
+def _login_claims():
+    db = SessionLocal()
+    try:
+        return decode_access_token(AuthService().login(db, identifier="a@x.com", password="pw"))
+    finally:
+        db.close()
+
+
+def _stale_registry(monkeypatch):
+    # Snapshot read under the current roles_version but missing codes, as when a permission
+    # is committed between the version read and the role permission cache load
+    db = SessionLocal()
+    permission_registry.sync_latest(db)
+    db.close()
+    monkeypatch.setattr(permission_registry, "_snapshot", ({}, 0))
+
+
+def test_missing_code_reloads_registry(seeded, monkeypatch):
+    monkeypatch.setattr(config, "TOKEN_PERMS_FORMAT", "bitset")
+    _stale_registry(monkeypatch)
+
+    claims = _login_claims()
+    assert "perms" not in claims
+    bit_index, version = permission_registry.snapshot()
+    assert claims["pver"] == version
+    assert PermissionBits.from_claims(claims, bit_index).codes() == ADMIN_PERMS
+
+
+def test_missing_code_falls_back_to_perms_list(seeded, monkeypatch):
+    monkeypatch.setattr(config, "TOKEN_PERMS_FORMAT", "bitset")
+    _stale_registry(monkeypatch)
+    monkeypatch.setattr(permission_registry, "sync_latest", lambda db, force=False: ({}, 0))
+
+    claims = _login_claims()
+    assert claims["perms"] == ADMIN_PERMS
+    assert "pbits" not in claims
+
+
+def _create_permission(code):
+    from src.db.models import Permission
+
+    db = SessionLocal()
+    try:
+        perm = Permission(code=code)
+        db.add(perm)
+        db.commit()
+        return perm.bit_index
+    finally:
+        db.close()
+
+
+def _delete_permission(code):
+    from sqlalchemy import select
+    from src.db.models import Permission
+
+    db = SessionLocal()
+    try:
+        db.delete(db.scalar(select(Permission).where(Permission.code == code)))
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_bits_of_deleted_permissions_are_not_reused(seeded):
+    first = _create_permission("room:read")
+    second = _create_permission("room:write")
+    assert second == first + 1
+
+    db = SessionLocal()
+    _, version_before = permission_registry.sync_latest(db, force=True)
+    db.close()
+    _delete_permission("room:write")
+    third = _create_permission("room:clean")
+    assert third == second + 1
+
+    db = SessionLocal()
+    bit_index, version = permission_registry.sync_latest(db, force=True)
+    db.close()
+    assert version == version_before + 1
+    # A token minted while room:write held its bit does not carry room:clean
+    old_token = PermissionBits(1 << second, bit_index)
+    assert not old_token.has("room:clean")
+
+
+def test_first_permission_bit_is_not_reused(engine):
+    from src.db.base import Base
+    from src.services.permission_cache import role_permission_cache
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    role_permission_cache.clear()
+    assert _create_permission("room:read") == 0
+    assert _create_permission("room:write") == 1
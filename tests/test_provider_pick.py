@@ -0,0 +1,39 @@
+from src.db.base import SessionLocal
+from src.db.models import ProviderEnum
+from src.db.seed_superadmin import upsert_user_with_identity
+from src.services.auth_service import AuthService
+
+
+def _login(identifier, password, provider=None):
+    db = SessionLocal()
+    try:
+        return AuthService().login(db, identifier=identifier, password=password, provider=provider)
+    finally:
+        db.close()
+
+
+def _add_username(identifier, password):
+    db = SessionLocal()
+    upsert_user_with_identity(db, full_name="Numeric", provider=ProviderEnum.username, identifier=identifier, password_plaintext=password)
+    db.commit()
+    db.close()
+
+
+def test_numeric_identifier_falls_back_to_room(seeded):
+    assert _login("101", "1234")
+
+
+def test_numeric_username_without_provider(seeded):
+    _add_username("12345", "pw3")
+
+    assert _login("12345", "pw3")
+    assert _login("12345", "pw3", ProviderEnum.username)
+    assert _login("12345", "pw3", ProviderEnum.room) is None
+
+
+def test_numeric_username_wins_over_room_with_the_same_number(seeded):
+    _add_username("101", "pw4")
+
+    assert _login("101", "pw4")
+    assert _login("101", "1234") is None
+    assert _login("101", "1234", ProviderEnum.room)
@@ -0,0 +1,47 @@
+import pytest
+from src.core.config import config
+from src.core.rate_limit import login_ip_limiter
+
+CLIENTS = ["203.0.113.7", "198.51.100.23"]
+
+
+@pytest.fixture
+def ip_keys(monkeypatch):
+    keys = []
+    monkeypatch.setattr(config, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(login_ip_limiter, "hit", lambda key: keys.append(key) or 0.0)
+    return keys
+
+
+def _flask_client(request):
+    from app import create_app
+
+    return create_app().test_client()
+
+
+def _asgi_client(request):
+    from starlette.testclient import TestClient
+    from asgi import create_app
+
+    request.getfixturevalue("async_engine")
+    return TestClient(create_app())
+
+
+@pytest.mark.parametrize("make_client", [_flask_client, _asgi_client], ids=["flask", "asgi"])
+def test_clients_behind_one_proxy_get_their_own_bucket(seeded, ip_keys, monkeypatch, request, make_client):
+    monkeypatch.setattr(config, "TRUSTED_PROXY_HOPS", 1)
+    client = make_client(request)
+    for ip in CLIENTS:
+        # A spoofed entry the client added itself comes before the one the proxy appended
+        client.post(
+            "/auth/login",
+            json={"identifier": "nobody@x.com", "password": "pw"},
+            headers={"X-Forwarded-For": f"10.9.9.9, {ip}"},
+        )
+    assert ip_keys == CLIENTS
+
+
+def test_forwarded_header_ignored_without_trusted_proxies(seeded, ip_keys, request):
+    client = _flask_client(request)
+    client.post("/auth/login", json={"identifier": "nobody@x.com", "password": "pw"}, headers={"X-Forwarded-For": CLIENTS[0]})
+    assert ip_keys == ["127.0.0.1"]
@@ -0,0 +1,58 @@
+import pytest
+from sqlalchemy import func, select
+from app import create_app
+from src.db.base import SessionLocal
+from src.db.models import User, user_roles
+from src.services.effective_permissions import find_drift
+from src.services.role_assignment import change_role_membership
+
+
+def _change(action, user_ids):
+    db = SessionLocal()
+    try:
+        result = change_role_membership(db, role_name="superadmin", action=action, user_ids=user_ids)
+        db.commit()
+        return result
+    finally:
+        db.close()
+
+
+def test_assign_and_revoke_touch_only_changed_users(statements):
+    assert _change("assign", [1, 2, 3])["changed"] == 2
+    db = SessionLocal()
+    assert find_drift(db) == (0, 0)
+    db.close()
+
+    statements.clear()
+    result = _change("assign", [1, 2, 3])
+    assert (result["changed"], result["unchanged"]) == (0, 3)
+    # Nothing changed, so effective permissions are left alone
+    assert not any("user_effective_permissions" in sql for sql in statements), statements
+
+    assert _change("revoke", [2, 3, 999])["changed"] == 2
+    db = SessionLocal()
+    assert find_drift(db) == (0, 0)
+    assert db.scalars(select(User.token_version).order_by(User.id)).all()[1:] == [2, 2]
+    db.close()
+
+
+@pytest.mark.parametrize("body", [
+    {"user_ids": "23"},
+    {"user_ids": [2, "3"]},
+    {"user_ids": [True]},
+    {"provider": "room", "identifiers": "101"},
+    {"provider": "room", "identifiers": [101]},
+    {"provider": "room", "identifier_prefix": 1},
+])
+def test_role_assignments_reject_non_list_targets(seeded, body):
+    with create_app().test_client() as client:
+        token = client.post("/auth/login", json={"identifier": "a@x.com", "password": "pw"}).json["access_token"]
+        resp = client.post(
+            "/admin/role-assignments",
+            json={"role": "superadmin", "action": "assign", **body},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+    assert resp.status_code == 400
+    db = SessionLocal()
+    assert db.scalar(select(func.count()).select_from(user_roles)) == 1
+    db.close()
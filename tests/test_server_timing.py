@@ -0,0 +1,38 @@
+import pytest
+from app import create_app
+from src.core.config import config
+
+
+@pytest.fixture
+def client(seeded):
+    with create_app().test_client() as flask_client:
+        yield flask_client
+
+
+def test_off_by_default(client):
+    assert config.SERVER_TIMING_ENABLED is False
+    assert "Server-Timing" not in client.post("/auth/login", json={"identifier": "a@x.com", "password": "pw"}).headers
+
+
+def test_login_never_reveals_phases(client, monkeypatch):
+    monkeypatch.setattr(config, "SERVER_TIMING_ENABLED", True)
+    monkeypatch.setattr(config, "METRICS_SAMPLE_RATE", 1.0)
+    headers = [
+        client.post("/auth/login", json={"identifier": identifier, "password": "wrong"}).headers["Server-Timing"]
+        for identifier in ("a@x.com", "nobody@x.com")
+    ]
+    for header in headers:
+        assert header.startswith("total;dur=")
+        assert "argon2" not in header and "db;" not in header
+
+    # The phases still reach the Prometheus histograms
+    assert 'phase="argon2"' in client.get("/metrics").get_data(as_text=True)
+
+
+def test_other_endpoints_keep_phases(client, monkeypatch):
+    monkeypatch.setattr(config, "SERVER_TIMING_ENABLED", True)
+    monkeypatch.setattr(config, "METRICS_SAMPLE_RATE", 1.0)
+    token = client.post("/auth/login", json={"identifier": "a@x.com", "password": "pw"}).json["access_token"]
+    resp = client.get("/admin/users", headers={"Authorization": f"Bearer {token}"})
+    assert resp.status_code == 200
+    assert "db;dur=" in resp.headers["Server-Timing"]
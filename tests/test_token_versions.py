@@ -0,0 +1,134 @@
+import json, time
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import select, update
+from app import create_app
+from src.db.base import SessionLocal
+from src.db.models import Role, User
+from src.services.bulk_import import import_identities
+from src.services.role_hierarchy import add_inheritance, remove_inheritance
+from src.services.token_versions import TokenVersionMap
+
+
+@pytest.fixture
+def client(seeded):
+    with create_app().test_client() as flask_client:
+        yield flask_client
+
+
+def _bearer(client, identifier, password):
+    token = client.post("/auth/login", json={"identifier": identifier, "password": password}).json["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _superadmin(db):
+    return db.scalar(select(Role).where(Role.name == "superadmin"))
+
+
+def test_me_is_served_from_claims(client, statements):
+    headers = _bearer(client, "a@x.com", "pw")
+    client.get("/auth/me", headers=headers)  # first request may sync the in-memory maps
+    statements.clear()
+    resp = client.get("/auth/me", headers=headers)
+    assert resp.status_code == 200
+    assert resp.json["roles"] == ["superadmin"]
+    assert resp.json["permissions"] == ["user:assign-role", "user:read", "user:write"]
+    assert statements == []
+
+
+def test_role_side_revoke_invalidates_tokens(client):
+    headers = _bearer(client, "a@x.com", "pw")
+    db = SessionLocal()
+    role = _superadmin(db)
+    role.users.remove(db.get(User, 1))
+    db.commit()
+    db.close()
+
+    assert client.get("/auth/me", headers=headers).status_code == 401
+    assert client.get("/auth/me", headers=_bearer(client, "a@x.com", "pw")).json["roles"] == []
+
+
+def test_role_side_assign_and_deactivation_invalidate_tokens(client):
+    headers = _bearer(client, "Concierge01", "pw2")
+    db = SessionLocal()
+    role = _superadmin(db)
+    role.users.append(db.get(User, 2))
+    db.commit()
+    assert client.get("/auth/me", headers=headers).status_code == 401
+
+    headers = _bearer(client, "Concierge01", "pw2")
+    assert client.get("/auth/me", headers=headers).json["roles"] == ["superadmin"]
+    db.get(User, 2).is_active = False
+    db.commit()
+    db.close()
+    assert client.get("/auth/me", headers=headers).status_code == 401
+
+
+def test_role_deletion_invalidates_tokens(client):
+    headers = _bearer(client, "a@x.com", "pw")
+    db = SessionLocal()
+    db.delete(_superadmin(db))
+    db.commit()
+    db.close()
+
+    assert client.get("/auth/me", headers=headers).status_code == 401
+    assert client.get("/admin/users", headers=headers).status_code == 401
+
+
+def test_inheritance_changes_invalidate_tokens(client):
+    db = SessionLocal()
+    frontdesk = Role(name="frontdesk", users=[db.get(User, 2)])
+    db.add(frontdesk)
+    db.commit()
+    headers = _bearer(client, "Concierge01", "pw2")
+
+    add_inheritance(db, frontdesk.id, _superadmin(db).id)
+    db.commit()
+    assert client.get("/auth/me", headers=headers).status_code == 401
+
+    headers = _bearer(client, "Concierge01", "pw2")
+    remove_inheritance(db, frontdesk.id, _superadmin(db).id)
+    db.commit()
+    db.close()
+    assert client.get("/auth/me", headers=headers).status_code == 401
+
+
+def test_bulk_import_role_links_invalidate_tokens(client, tmp_path):
+    headers = _bearer(client, "101", "1234")
+    source = tmp_path / "residents.jsonl"
+    source.write_text("\n".join(json.dumps(row) for row in [
+        {"provider": "room", "identifier": "101", "password": "1234", "roles": "superadmin"},
+        {"provider": "room", "identifier": "102", "password": "5678", "roles": "superadmin"},
+    ]))
+    import_identities(SessionLocal, str(source), workers=1, log=lambda line: None)
+
+    assert client.get("/auth/me", headers=headers).status_code == 401
+    db = SessionLocal()
+    versions = dict(db.execute(select(User.id, User.token_version).where(User.id >= 3)).all())
+    db.close()
+    assert versions == {3: 1, 4: 0}  # the new user had no tokens to invalidate
+
+
+def test_map_only_holds_bumps_within_token_lifetime(seeded):
+    db = SessionLocal()
+    now = datetime.now(timezone.utc)
+    db.execute(update(User).where(User.id == 1).values(token_version=3, token_version_changed_at=now - timedelta(hours=3)))
+    db.execute(update(User).where(User.id == 2).values(token_version=2, token_version_changed_at=now))
+    db.commit()
+
+    versions = TokenVersionMap(sync_interval=0, token_lifetime_s=3600)
+    versions.apply({3: 5}, changed_at=time.time() - 3 * 3600)
+    versions.sync(db)
+    db.close()
+
+    assert versions.stats()["users"] == 1
+    assert versions.is_current(1, 0)  # every token from before that bump has expired
+    assert not versions.is_current(2, 1)
+    assert versions.is_current(2, 2)
+    assert versions.is_current(3, 0)
+
+
+def test_logout_revokes_the_bearer_token(client):
+    headers = _bearer(client, "a@x.com", "pw")
+    assert client.post("/auth/logout", headers=headers).status_code == 204
+    assert client.get("/auth/me", headers=headers).status_code == 401